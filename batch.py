@@ -0,0 +1,195 @@
+"""
+Пакетная обработка изображений без GUI.
+
+    python -m batch images/ "jobs/*.png" -o out --threshold 127 --mode raster
+
+Для каждого изображения сохраняет траекторию (<имя>.toolpath.npz, с --format gcode —
+<имя>.gcode, с --format job — двоичный файл задания <имя>.lzjob) и записывает сводку по всем заданиям в summary.csv,
+включая оценку времени выполнения (job_time, секунды). С --simulate задание
+дополнительно прогоняется через ускоренный симулятор: рядом сохраняются карта
+плотности прожига (<имя>.density.png) и журнал времени по отрезкам (<имя>.timing.csv).
+"""
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import config
+from controllers.gcode import segments_to_gcode, write_gcode, units_per_second
+from processing.extraction import DEFAULT_THRESHOLD, MODE_LUMA, MODE_LIGHTNESS
+from processing.pipeline import process_file, JOB_TYPES, JOB_RASTER
+from processing.dither import DITHER_MODES, DITHER_NONE
+from processing.estimate import estimate_job
+from processing.job_file import write_job, JOB_EXTENSION
+from processing.simulate import JobSimulator, hotspots, density_image
+
+IMAGE_EXTENSIONS = {".bmp", ".png", ".jpg", ".jpeg"}
+OUTPUT_FORMATS = {"npz": ".toolpath.npz", "gcode": ".gcode", "job": JOB_EXTENSION}
+
+SUMMARY_FIELDS = [
+    "file", "status", "width", "height", "points", "segments",
+    "burn_length", "travel_length", "laser_switches", "burn_time", "travel_time", "job_time",
+    "max_dwell", "hotspots",
+    "speed", "seconds", "output", "error",
+]
+
+
+def collect_inputs(patterns):
+    """Раскрывает каталоги и glob-шаблоны в отсортированный список файлов изображений."""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = Path(pattern).iterdir()
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+        for path in candidates:
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                files.add(path)
+    return sorted(files)
+
+
+def write_output(result, output_path, options):
+    if options["format"] == "gcode":
+        lines = segments_to_gcode(result["segments"], options["speed"], powers=result["powers"])
+        write_gcode(output_path, lines)
+        return
+
+    if options["format"] == "job":
+        write_job(output_path, result["segments"], result["width"], result["height"],
+                  result["powers"], speed=options["speed"])
+        return
+
+    arrays = {
+        "segments": result["segments"],
+        "shape": np.array([result["height"], result["width"]]),
+        "speed": np.array(options["speed"]),
+    }
+    if result["powers"] is not None:
+        arrays["powers"] = result["powers"]
+    np.savez_compressed(output_path, **arrays)
+
+
+def simulate_job(result, output_path, options):
+    """Карта плотности и журнал времени задания; возвращает поля сводки."""
+    simulator = JobSimulator(result["segments"], (result["height"], result["width"]),
+                             units_per_second(options["speed"]), result["powers"],
+                             options["acceleration"])
+    density = simulator.run()
+    base = str(output_path).removesuffix(OUTPUT_FORMATS[options["format"]])
+    cv2.imwrite(base + ".density.png", density_image(density))
+    simulator.save_timing(base + ".timing.csv")
+    return {"max_dwell": round(float(density.max()), 6), "hotspots": len(hotspots(density))}
+
+
+def run_job(path, output_dir, options):
+    """Обрабатывает один файл; выполняется в процессе пула. Возвращает строку сводки."""
+    started = time.perf_counter()
+    row = {"file": str(path), "speed": options["speed"]}
+    try:
+        result = process_file(path, options["threshold"], options["brightness"], options["mode"],
+                              options["dither"])
+        output_path = Path(output_dir) / (Path(path).stem + OUTPUT_FORMATS[options["format"]])
+        write_output(result, output_path, options)
+        estimate = estimate_job(result["segments"], units_per_second(options["speed"]),
+                                options["acceleration"])
+
+        row.update(
+            status="ok",
+            width=result["width"],
+            height=result["height"],
+            points=result["points"],
+            segments=len(result["segments"]),
+            burn_length=round(result["burn_length"], 3),
+            travel_length=round(result["travel_length"], 3),
+            laser_switches=estimate["laser_switches"],
+            burn_time=round(estimate["burn_time"], 3),
+            travel_time=round(estimate["travel_time"], 3),
+            job_time=round(estimate["total_time"], 3),
+            output=str(output_path),
+        )
+        if options["simulate"]:
+            row.update(simulate_job(result, output_path, options))
+    except Exception as error:  # Ошибка одного задания не должна останавливать всю пачку
+        row.update(status="error", error=str(error))
+
+    row["seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def run_batch(inputs, output_dir, options, workers=None):
+    """Обрабатывает файлы в пуле процессов и возвращает строки сводки в порядке входа."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    rows = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, path, output_dir, options): path for path in inputs}
+        for future in as_completed(futures):
+            row = future.result()
+            rows[futures[future]] = row
+            print(f"{row['status']:>5}  {row['file']}  ({row['seconds']} с)")
+
+    ordered = [rows[path] for path in inputs]
+    with open(Path(output_dir) / "summary.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(ordered)
+    return ordered
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная подготовка заданий для лазера без GUI")
+    parser.add_argument("inputs", nargs="+", help="каталоги, файлы или glob-шаблоны изображений")
+    parser.add_argument("-o", "--output", default="batch_output", help="каталог для результатов")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help="порог яркости: пиксели <= порога прожигаются")
+    parser.add_argument("--mode", choices=JOB_TYPES, default=JOB_RASTER, help="тип задания")
+    parser.add_argument("--dither", choices=DITHER_MODES, default=DITHER_NONE,
+                        help="порог, дизеринг (bayer, floyd-steinberg, jarvis) или модуляция мощности")
+    parser.add_argument("--brightness", choices=(MODE_LUMA, MODE_LIGHTNESS), default=MODE_LUMA,
+                        help="способ перевода цвета в яркость")
+    parser.add_argument("--speed", type=float, default=config.DEFAULT_SPEED,
+                        help="скорость прожига, шагов в секунду")
+    parser.add_argument("--acceleration", type=float, default=config.MAX_ACCELERATION,
+                        help="ускорение для оценки времени задания, единиц/с²")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="npz",
+                        help="формат результата: траектория NumPy, G-код или файл задания")
+    parser.add_argument("--simulate", action="store_true",
+                        help="сохранить карту плотности прожига и журнал времени по отрезкам")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="число процессов (по умолчанию — по числу ядер)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("⚠️ Не найдено изображений для обработки.")
+        return 1
+
+    options = {
+        "threshold": args.threshold,
+        "mode": args.mode,
+        "brightness": args.brightness,
+        "dither": args.dither,
+        "speed": args.speed,
+        "acceleration": args.acceleration,
+        "format": args.format,
+        "simulate": args.simulate,
+    }
+    rows = run_batch(inputs, args.output, options, args.workers)
+
+    failed = sum(row["status"] != "ok" for row in rows)
+    print(f"✅ Обработано заданий: {len(rows) - failed}, с ошибками: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Замеры производительности горячих путей: обработка изображения, отрисовка
+поля, анимация прожига и опрос планировщика движения.
+
+    python -m benchmarks --sizes 500 2000 --save baseline.json
+    python -m benchmarks --compare baseline.json
+
+Работает без дисплея (платформа Qt offscreen). Для каждого замера печатает
+медианное время, пропускную способность и пиковую память (tracemalloc);
+с --compare завершается с кодом 1, если есть регрессии.
+
+Время запуска приложения проверяется отдельно: python -m benchmarks.startup.
+"""
+import argparse
+import os
+import sys
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности lazer")
+    parser.add_argument("--only", action="append", default=[],
+                        help="запускать только замеры, в имени которых есть подстрока (можно несколько)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="стороны изображений, пикселей (по умолчанию 500 … 10000)")
+    parser.add_argument("--repeat", type=int, default=3, help="запусков на замер времени")
+    parser.add_argument("--save", help="сохранить результаты как базовые (JSON)")
+    parser.add_argument("--compare", help="сравнить с базовыми результатами (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="допустимое ухудшение относительно базовых, доля")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    from benchmarks import cases
+    from benchmarks.runner import BENCHMARKS, measure, save_results, load_results, compare_results
+
+    results = []
+    for bench in BENCHMARKS:
+        if args.only and not any(part in bench.name for part in args.only):
+            continue
+        sizes = bench.sizes
+        if args.sizes and bench.sizes is cases.IMAGE_SIZES:
+            sizes = args.sizes
+        for size in sizes:
+            result = measure(bench, size, args.repeat)
+            results.append(result)
+            print(f"{bench.name:<36} {size:>9}  {result['seconds'] * 1000:10.2f} мс  "
+                  f"{result['throughput']:14,.0f} {bench.unit:<9} {result['peak_mb']:8.1f} МБ")
+            app.processEvents()
+
+    if args.save:
+        save_results(args.save, results)
+        print(f"✅ Базовые результаты сохранены: {args.save}")
+
+    if args.compare:
+        regressions = compare_results(results, load_results(args.compare), args.tolerance)
+        for line in regressions:
+            print(f"⚠️ Регрессия: {line}")
+        if regressions:
+            return 1
+        print("✅ Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
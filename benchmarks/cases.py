@@ -0,0 +1,170 @@
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QLabel
+
+from benchmarks.runner import benchmark
+from controllers.motor_controller import MotorController
+from controllers.scanner import Scanner
+from processing.extraction import mask_to_points
+from processing.toolpath import raster_runs, runs_to_segments
+from ui.burn_preview import BurnPreview
+from ui.image_loader import ImageLoader
+from ui.laser_view import LaserView
+from ui.main_window import MainWindow
+
+IMAGE_SIZES = (500, 1000, 2000, 5000, 10000)  # Сторона синтетического изображения, пикселей
+TRAIL_SIZES = (10_000, 100_000, 1_000_000)    # Точек в «следе» LaserView
+JOB_SIZES = (1_000, 10_000, 100_000)          # Отрезков в задании для MotorController
+ANIMATION_FRAMES = 100                        # Кадров анимации прожига за один запуск
+MOTOR_TICKS = 1000                            # Опросов планировщика за один запуск
+
+_images = {}
+_workdir = tempfile.mkdtemp(prefix="lazer-bench-")
+
+
+def synthetic_gray(size):
+    """Изображение size×size: диагональный градиент с кругами и шумом — около половины тёмных пикселей."""
+    rng = np.random.default_rng(size)
+    ys, xs = np.ogrid[:size, :size]
+    gray = ((xs + ys) * (255 / (2 * size))).astype(np.uint8)
+    for _ in range(8):
+        cx, cy, r = rng.integers(0, size, 3)
+        circle = (xs - cx) ** 2 + (ys - cy) ** 2 <= (r // 3) ** 2
+        gray[circle] = 255 - gray[circle]
+    gray ^= rng.integers(0, 32, gray.shape, dtype=np.uint8)
+    return gray
+
+
+def synthetic_image(size):
+    """Путь к BMP-файлу с синтетическим изображением (создаётся один раз за запуск)."""
+    if size not in _images:
+        path = os.path.join(_workdir, f"synthetic_{size}.bmp")
+        cv2.imwrite(path, synthetic_gray(size))
+        _images[size] = path
+    return _images[size]
+
+
+def fill_trail(view, count):
+    """Заполняет след view ломаной из count точек, змейкой по полю."""
+    rng = np.random.default_rng(count)
+    width = view.field_width
+    steps = np.arange(count)
+    rows = steps // width
+    xs = np.where(rows % 2 == 0, steps % width, width - 1 - steps % width)
+    ys = (rows * 3 + rng.integers(0, 2, count)) % view.field_height
+    view.trail.extend(np.column_stack([xs, ys]) + view.margin)
+
+
+@benchmark("image_loader.process_image", IMAGE_SIZES, "px/s")
+def image_loader_process(size):
+    loader = ImageLoader()
+    loader.job_cache = None
+    loader.load_file(synthetic_image(size))
+
+    def run():
+        loader.threshold_index = None
+        loader.process_image()
+
+    return run, size * size
+
+
+@benchmark("scanner.analyze_image", IMAGE_SIZES, "px/s")
+def scanner_analyze(size):
+    scanner = Scanner(synthetic_image(size))
+    return scanner.analyze_image, size * size
+
+
+@benchmark("laser_view.set_laser_path", IMAGE_SIZES, "points/s")
+def laser_view_set_path(size):
+    view = LaserView()
+    points = mask_to_points(synthetic_gray(size) <= 127)
+    return (lambda: view.set_laser_path(points)), len(points)
+
+
+@benchmark("laser_view.paint_trail", TRAIL_SIZES, "points/s")
+def laser_view_paint(size):
+    """Первый кадр после загрузки большого следа: весь след рисуется в растровый слой."""
+    view = LaserView()
+    view.setFixedSize(508, 508)
+    fill_trail(view, size)
+
+    def run():
+        view.trail_image = None
+        view.grab()
+
+    return run, size
+
+
+@benchmark("laser_view.paint_zoomed", TRAIL_SIZES, "frames/s")
+def laser_view_paint_zoomed(size):
+    """Полная перерисовка при зуме ×8 (статический слой пересоздаётся каждый кадр)."""
+    view = LaserView()
+    view.setFixedSize(508, 508)
+    fill_trail(view, size)
+    view.set_laser_path(mask_to_points(synthetic_gray(500) <= 127))
+    view.set_zoom_enabled(True)
+    view.zoom_center = (250, 250)
+    view.zoom_factor = 8.0
+    view.grab()
+
+    def run():
+        view.static_layer = None
+        view.grab()
+
+    return run, 1
+
+
+@benchmark("main_window.animate_laser", IMAGE_SIZES, "points/s")
+def main_window_animate(size):
+    window = MainWindow()
+    loader = window.image_loader
+    loader.job_cache = None
+    loader.load_file(synthetic_image(size))
+    loader.process_image()
+    simulation = loader.create_laser_simulation()
+    window.laser_label = QLabel()
+    window.update_image_label(window.laser_label, simulation)
+    window.laser_timer = QTimer(window)  # Не запускается: кадры вызываются вручную
+
+    def run():
+        simulation[...] = 255
+        preview = BurnPreview(simulation, loader.points, loader.mask.shape, duration_ms=1000)
+        preview.start()
+        window.burn_preview = preview
+        for frame in range(1, ANIMATION_FRAMES + 1):
+            # Кадры равномерно по длительности анимации, без ожидания таймера
+            preview.started = time.monotonic() - preview.duration * frame / ANIMATION_FRAMES
+            window.animate_laser()
+
+    return run, len(loader.points)
+
+
+@benchmark("motor_controller.update_position", JOB_SIZES, "ticks/s")
+def motor_update_position(size):
+    view = LaserView()
+    motor = MotorController(view)
+    mask = np.zeros((500, 500), dtype=bool)
+    mask.reshape(-1)[::3] = True  # Равномерно разбросанные серии: отрезки по всему полю
+    segments = runs_to_segments(raster_runs(mask))[:size]
+    motor.run_segments(segments)
+    motor.timer.stop()
+    motor.planner.thread.join()
+    total, _ = motor.planner.horizon()
+
+    def run():
+        view.clear_trajectory()
+        motor.x = motor.y = 0
+        motor.drawing = False
+        motor.block_index = 0
+        motor.moving = True
+        motor.job_running = True
+        for tick in range(1, MOTOR_TICKS + 1):
+            motor.start_time = time.monotonic() - total * tick / MOTOR_TICKS
+            motor.update_position()
+
+    return run, MOTOR_TICKS
@@ -0,0 +1,99 @@
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+BENCHMARKS = []  # Зарегистрированные замеры в порядке объявления
+
+
+class Benchmark:
+    """
+    Замер одного горячего пути. setup(size) готовит данные (не замеряется)
+    и возвращает (run, items): run() — замеряемое действие, items — объём
+    работы за один запуск (пиксели, точки, тики) для расчёта пропускной способности.
+    """
+
+    def __init__(self, name, setup, sizes, unit):
+        self.name = name
+        self.setup = setup
+        self.sizes = sizes
+        self.unit = unit
+
+
+def benchmark(name, sizes, unit):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, sizes, unit))
+        return setup
+    return register
+
+
+def measure(bench, size, repeat=3):
+    """
+    Один замер: пиковая память — по первому запуску под tracemalloc,
+    время — медиана repeat запусков без него (tracemalloc замедляет код).
+    """
+    run, items = bench.setup(size)
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+
+    seconds = statistics.median(times)
+    return {
+        "name": bench.name,
+        "size": size,
+        "seconds": seconds,
+        "throughput": items / seconds if seconds > 0 else float("inf"),
+        "unit": bench.unit,
+        "peak_mb": peak / 1024 / 1024,
+    }
+
+
+def result_key(result):
+    return f"{result['name']}[{result['size']}]"
+
+
+def save_results(path, results):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result_key(result): result for result in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare_results(results, baseline, tolerance=0.25):
+    """
+    Сравнивает с базовыми замерами. Регрессия — время или пиковая память
+    больше базовых более чем на tolerance (доля). Возвращает список описаний.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result_key(result))
+        if base is None:
+            continue
+        for field in ("seconds", "peak_mb"):
+            # Мелкие величины шумят: сравниваем только от 1 мс и 1 МБ
+            floor = 0.001 if field == "seconds" else 1.0
+            if result[field] > max(base[field], floor) * (1 + tolerance):
+                regressions.append(
+                    f"{result_key(result)}: {field} {base[field]:.4g} -> {result[field]:.4g}"
+                )
+    return regressions
@@ -0,0 +1,102 @@
+"""
+Проверка времени запуска: импорт ui.main_window и создание главного окна
+до первого обработанного кадра. Каждый замер — в отдельном процессе,
+чтобы модули не были уже загружены.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --startup-budget 0.8
+
+Завершается с кодом 1, если медиана превышает бюджет или при старте
+загрузился модуль из LAZY_MODULES (они должны загружаться по требованию).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Бюджеты, секунды (медиана; время запуска самого интерпретатора не входит).
+# С отложенной загрузкой OpenCV и обработки: около 0.14 и 0.19 с,
+# с загрузкой при старте было 0.24 и 0.31 с.
+IMPORT_BUDGET = 0.2   # import ui.main_window
+STARTUP_BUDGET = 0.3  # импорт + QApplication + MainWindow + первый кадр
+
+# Модули, которые не должны загружаться до первой обработки изображения
+LAZY_MODULES = (
+    "cv2",
+    "http.server",
+    "ui.image_loader",
+    "processing.pipeline",
+    "processing.tiled",
+    "processing.parallel",
+    "processing.contours",
+    "processing.job_cache",
+    "processing.burn_mask",
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+import ui.main_window
+imported = time.perf_counter()
+app = QApplication(sys.argv[:1])
+window = ui.main_window.MainWindow()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps({"import": imported - started, "startup": shown - started, "modules": sorted(sys.modules)}))
+"""
+
+
+def probe():
+    """Один запуск в чистом процессе: {"import": с, "startup": с, "modules": [...]}."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    completed = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check(repeat=5, import_budget=IMPORT_BUDGET, startup_budget=STARTUP_BUDGET):
+    """Замеряет запуск repeat раз; возвращает (медианы, список нарушений)."""
+    runs = [probe() for _ in range(repeat)]
+    medians = {key: statistics.median(run[key] for run in runs) for key in ("import", "startup")}
+
+    problems = []
+    if medians["import"] > import_budget:
+        problems.append(f"импорт {medians['import'] * 1000:.0f} мс > {import_budget * 1000:.0f} мс")
+    if medians["startup"] > startup_budget:
+        problems.append(f"запуск {medians['startup'] * 1000:.0f} мс > {startup_budget * 1000:.0f} мс")
+    loaded = sorted(set(LAZY_MODULES) & set(runs[0]["modules"]))
+    if loaded:
+        problems.append("при старте загружены: " + ", ".join(loaded))
+    return medians, problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проверка времени запуска lazer")
+    parser.add_argument("--repeat", type=int, default=5, help="запусков (берётся медиана)")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="бюджет импорта, с")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET, help="бюджет запуска, с")
+    args = parser.parse_args(argv)
+
+    medians, problems = check(args.repeat, args.import_budget, args.startup_budget)
+    print(f"Импорт ui.main_window: {medians['import'] * 1000:.0f} мс "
+          f"(бюджет {args.import_budget * 1000:.0f} мс)")
+    print(f"Окно готово:           {medians['startup'] * 1000:.0f} мс "
+          f"(бюджет {args.startup_budget * 1000:.0f} мс)")
+    for problem in problems:
+        print(f"⚠️ {problem}")
+    if problems:
+        return 1
+    print("✅ Запуск укладывается в бюджет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import os
+
 # Размер поля обработки (единицы)
 FIELD_WIDTH = 500
 FIELD_HEIGHT = 500
@@ -5,3 +7,34 @@ FIELD_HEIGHT = 500
 # Настройки шагового двигателя
 STEP_SIZE = 1  # Один шаг = 1 единица
 DEFAULT_SPEED = 10  # Шагов в секунду
+# Скорость везде (интерфейс, пакетная обработка, G-код, диспетчер) — в шагах в секунду;
+# перевод в единицы поля один: controllers.gcode.units_per_second()
+MIN_SPEED = 1
+MAX_SPEED = 1000
+
+# Значение S для полной мощности лазера (GRBL: $30=1000)
+MAX_POWER = 1000
+
+# Кинематика (симуляция движения)
+TICK_MS = 30  # Период опроса планировщика и обновления интерфейса при движении, мс
+MAX_ACCELERATION = 2000  # Ускорение, единиц/с²
+JUNCTION_DEVIATION = 0.05  # Допуск отклонения на стыке отрезков (как в GRBL), единиц
+
+# Большие изображения обрабатываются полосами, начиная с этого числа пикселей
+TILED_MIN_PIXELS = 40_000_000
+
+# Изображения от этого числа пикселей обрабатываются в нескольких процессах
+PARALLEL_MIN_PIXELS = 4_000_000
+
+# Высота превью в окне просмотра: копии для показа и холст анимации прожига
+# хранятся только в этом разрешении
+PREVIEW_HEIGHT = 300
+
+# Кэш обработанных заданий на диске
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "lazer", "jobs")
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 ГБ
+
+# Метрики горячих путей (metrics.py): включаются LAZER_METRICS=1
+METRICS_ENABLED = os.environ.get("LAZER_METRICS") == "1"
+METRICS_PORT = int(os.environ.get("LAZER_METRICS_PORT", "0"))  # HTTP /metrics; 0 — не запускать
+METRICS_FILE = os.environ.get("LAZER_METRICS_FILE", "")  # Куда сохранить метрики при выходе
@@ -0,0 +1,95 @@
+import numpy as np
+
+import config
+
+def units_per_second(speed=None):
+    """Скорость в единицах поля в секунду из скорости в шагах в секунду."""
+    if speed is None:
+        speed = config.DEFAULT_SPEED
+    return speed * config.STEP_SIZE
+
+
+def feed_rate(speed=None):
+    """Скорость подачи F (единиц в минуту) из скорости в шагах в секунду."""
+    return units_per_second(speed) * 60
+
+
+def _fmt(value):
+    """Короткая запись числа для G-кода: без лишних нулей и точки."""
+    text = f"{value:.3f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def segments_to_gcode(segments, speed=None, power=config.MAX_POWER, home=True, powers=None):
+    """
+    Генерирует строки G-кода для отрезков прожига (x0, y0, x1, y1).
+
+    Переезды между несмежными отрезками — G0 с выключенным лазером (M5),
+    прожиг — G1 с включённым лазером (M3 S<power>). powers — необязательная
+    мощность S для каждого отрезка (режим модуляции мощности); S выводится
+    только при изменении. Генератор, поэтому большие задания можно передавать
+    отправителю, не собирая весь текст в памяти.
+    """
+    segments = np.asarray(segments).reshape(-1, 4)
+    if powers is None:
+        powers = np.full(len(segments), power)
+    return chunks_to_gcode([(segments, powers, None)], speed, home)
+
+
+def chunks_to_gcode(chunks, speed=None, home=True):
+    """
+    То же, что segments_to_gcode, но для задания, приходящего порциями
+    (segments, powers, speeds) — например, из файла задания. speeds —
+    скорость каждого отрезка в шагах/с (0 — скорость speed) или None.
+    """
+    default_feed = _fmt(feed_rate(speed))
+
+    yield "G21"  # Миллиметры: одна единица поля — 1 мм
+    yield "G90"  # Абсолютные координаты
+    yield "M5"
+
+    laser_on = False
+    current_feed = None
+    current_power = None
+    position = (0, 0)
+    for segments, powers, speeds in chunks:
+        segments = np.asarray(segments).reshape(-1, 4).tolist()
+        powers = np.asarray(powers).tolist()
+        speeds = [0] * len(segments) if speeds is None else np.asarray(speeds).tolist()
+        for (x0, y0, x1, y1), segment_power, segment_speed in zip(segments, powers, speeds):
+            if (x0, y0) != position:
+                if laser_on:
+                    yield "M5"
+                    laser_on = False
+                yield f"G0 X{_fmt(x0)} Y{_fmt(y0)}"
+
+            if not laser_on:
+                yield f"M3 S{_fmt(segment_power)}"
+                laser_on = True
+                current_power = segment_power
+
+            line = f"G1 X{_fmt(x1)} Y{_fmt(y1)}"
+            if segment_power != current_power:
+                line += f" S{_fmt(segment_power)}"
+                current_power = segment_power
+            feed = _fmt(feed_rate(segment_speed)) if segment_speed else default_feed
+            if feed != current_feed:
+                line += f" F{feed}"
+                current_feed = feed
+            yield line
+            position = (x1, y1)
+
+    yield "M5"
+    if home:
+        yield "G0 X0 Y0"
+
+
+def write_gcode(path, lines):
+    """Записывает строки G-кода в файл; возвращает их количество."""
+    count = 0
+    with open(path, "w", encoding="ascii") as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+            count += 1
+    return count
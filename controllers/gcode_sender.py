@@ -0,0 +1,158 @@
+import os
+import select
+import termios
+import time
+import tty
+from collections import deque
+
+RX_BUFFER_SIZE = 128  # Размер приёмного буфера контроллера GRBL, байт
+SOFT_RESET = b"\x18"  # Ctrl-X: GRBL очищает буферы и заново присылает приветствие
+
+
+def clean_line(line):
+    """Убирает комментарии и пробелы: контроллеру передаются только значимые символы."""
+    line = line.split(";", 1)[0]
+    while "(" in line and ")" in line:
+        start = line.index("(")
+        line = line[:start] + line[line.index(")", start) + 1:]
+    return "".join(line.split()).upper()
+
+
+class GcodeSender:
+    """
+    Потоковая передача G-кода с контролем по числу символов (character counting).
+
+    Вместо ожидания «ok» после каждой строки отправитель держит в приёмном буфере
+    контроллера столько строк, сколько в него помещается, и учитывает их длины.
+    Буфер планировщика контроллера всё время заполнен, и на плотных растровых
+    заданиях головка не останавливается между командами.
+    """
+
+    def __init__(self, port, baudrate=115200, rx_buffer_size=RX_BUFFER_SIZE, timeout=10.0):
+        self.port = port
+        self.baudrate = baudrate
+        self.rx_buffer_size = rx_buffer_size
+        self.timeout = timeout
+        self.fd = None
+        self.pending = b""
+        self.errors = []  # Ошибки контроллера за последнюю передачу
+
+    def open(self):
+        self.fd = os.open(self.port, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self.fd)
+        baud = getattr(termios, f"B{self.baudrate}", None)
+        if baud is not None:
+            attrs = termios.tcgetattr(self.fd)
+            attrs[4] = attrs[5] = baud
+            termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+        return self
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read_line(self, timeout=None):
+        """Читает одну строку ответа контроллера; TimeoutError, если ответа нет."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while b"\n" not in self.pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Нет ответа от контроллера {self.port}")
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if ready:
+                self.pending += os.read(self.fd, 1024)
+
+        line, self.pending = self.pending.split(b"\n", 1)
+        return line.strip().decode("ascii", "replace")
+
+    def wait_ack(self):
+        """
+        Ждёт «ok» или «error:N» на одну отправленную строку.
+        Приветствие, статусы и сообщения в квадратных скобках пропускаются.
+        """
+        while True:
+            response = self.read_line()
+            if response == "ok":
+                return True
+            if response.startswith("error"):
+                self.errors.append(response)
+                return False
+
+    def reset(self, timeout=None):
+        """
+        Мягкий сброс контроллера: неподтверждённые строки прерванной передачи
+        выбрасываются вместе с их ответами, чтобы не попасть в следующее задание.
+        Ждёт приветствия «Grbl …», затем снимает блокировку после сброса ($X).
+        """
+        self.pending = b""
+        os.write(self.fd, SOFT_RESET)
+        while not self.read_line(timeout).startswith("Grbl"):
+            pass
+        self.send_and_wait(["$X"])
+
+    def stream(self, lines, progress=None):
+        """
+        Отправляет строки G-кода с контролем по числу символов.
+        progress(sent, acknowledged) вызывается после каждого подтверждения.
+        Возвращает словарь со статистикой передачи.
+        """
+        self.errors = []
+        in_flight = deque()  # Длины строк, ещё не подтверждённых контроллером
+        buffered = 0
+        sent = acknowledged = 0
+        started = time.monotonic()
+
+        for line in lines:
+            line = clean_line(line)
+            if not line:
+                continue
+            data = (line + "\n").encode("ascii")
+            if len(data) > self.rx_buffer_size:
+                raise ValueError(f"Строка длиннее буфера контроллера: {line}")
+
+            # Ждём, пока в буфере контроллера освободится место под строку
+            while buffered + len(data) > self.rx_buffer_size:
+                self.wait_ack()
+                buffered -= in_flight.popleft()
+                acknowledged += 1
+                if progress:
+                    progress(sent, acknowledged)
+
+            os.write(self.fd, data)
+            in_flight.append(len(data))
+            buffered += len(data)
+            sent += 1
+
+        while in_flight:
+            self.wait_ack()
+            buffered -= in_flight.popleft()
+            acknowledged += 1
+            if progress:
+                progress(sent, acknowledged)
+
+        return {
+            "lines": sent,
+            "errors": list(self.errors),
+            "seconds": time.monotonic() - started,
+        }
+
+    def send_and_wait(self, lines):
+        """Простая передача «строка — ok» (для сравнения и для команд настройки)."""
+        self.errors = []
+        started = time.monotonic()
+        sent = 0
+        for line in lines:
+            line = clean_line(line)
+            if not line:
+                continue
+            os.write(self.fd, (line + "\n").encode("ascii"))
+            self.wait_ack()
+            sent += 1
+        return {"lines": sent, "errors": list(self.errors), "seconds": time.monotonic() - started}
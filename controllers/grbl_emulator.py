@@ -0,0 +1,129 @@
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from collections import deque
+
+from controllers.gcode_sender import RX_BUFFER_SIZE, SOFT_RESET
+
+GREETING = b"\r\nGrbl 1.1h ['$' for help]\r\n"
+
+
+class GrblEmulator:
+    """
+    Локальный эмулятор контроллера в духе GRBL на псевдотерминале (pty).
+
+    Моделирует приёмный буфер на rx_buffer_size байт и буфер планировщика
+    на planner_size блоков: строка разбирается и подтверждается «ok», только
+    когда в планировщике есть место, а каждое движение исполняется block_time секунд.
+    latency — задержка ответа, как у последовательного порта и USB.
+    Статистика показывает переполнения буфера и простои планировщика.
+    """
+
+    def __init__(self, rx_buffer_size=RX_BUFFER_SIZE, planner_size=15, block_time=0.001, latency=0.0):
+        self.rx_buffer_size = rx_buffer_size
+        self.planner_size = planner_size
+        self.block_time = block_time
+        self.latency = latency
+
+        self.master = None
+        self.slave = None
+        self.port = None
+        self.thread = None
+        self.running = False
+
+        self.rx = bytearray()
+        self.planner = deque()  # Время окончания каждого блока в планировщике
+        self.responses = deque()  # (время отправки, ответ) — ответы с задержкой
+        self.last_block_end = None
+        self.lines = []         # Все принятые строки
+        self.overflows = 0
+        self.max_rx_used = 0
+        self.idle_time = 0.0    # Сколько планировщик простаивал пустым между блоками
+        self.resets = 0
+
+    def start(self):
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        os.write(self.master, GREETING)
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        for fd in (self.master, self.slave):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        return {
+            "lines": len(self.lines),
+            "overflows": self.overflows,
+            "max_rx_used": self.max_rx_used,
+            "idle_time": self.idle_time,
+            "resets": self.resets,
+        }
+
+    def _execute(self, line):
+        """Ставит движение в планировщик; остальные команды выполняются мгновенно."""
+        if line.startswith(("G0", "G1")):
+            now = time.monotonic()
+            if self.planner:
+                begin = self.planner[-1]
+            else:
+                begin = now
+                if self.last_block_end is not None:
+                    self.idle_time += now - self.last_block_end
+            self.planner.append(begin + self.block_time)
+
+    def _run(self):
+        while self.running:
+            now = time.monotonic()
+            while self.planner and self.planner[0] <= now:
+                self.last_block_end = self.planner.popleft()
+            while self.responses and self.responses[0][0] <= now:
+                os.write(self.master, self.responses.popleft()[1])
+
+            ready, _, _ = select.select([self.master], [], [], self.block_time / 2)
+            if ready:
+                try:
+                    data = os.read(self.master, 1024)
+                except OSError:
+                    return
+                if SOFT_RESET in data:
+                    # Сброс: буферы и планировщик очищаются, неотправленные ответы теряются
+                    data = data[data.rindex(SOFT_RESET) + 1:]
+                    self.rx.clear()
+                    self.planner.clear()
+                    self.responses.clear()
+                    self.resets += 1
+                    os.write(self.master, GREETING)
+                self.rx.extend(data)
+                if len(self.rx) > self.rx_buffer_size:
+                    self.overflows += 1  # Реальный контроллер потерял бы эти символы
+                self.max_rx_used = max(self.max_rx_used, len(self.rx))
+
+            # Разбираем строки, пока в планировщике есть место
+            while b"\n" in self.rx and len(self.planner) < self.planner_size:
+                line, _, rest = self.rx.partition(b"\n")
+                self.rx = bytearray(rest)
+                text = line.strip().decode("ascii", "replace")
+                self.lines.append(text)
+                if text:
+                    self._execute(text)
+                self.responses.append((time.monotonic() + self.latency, b"ok\r\n"))
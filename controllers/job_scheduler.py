@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import config
+from controllers.gcode import chunks_to_gcode, units_per_second
+from controllers.gcode_sender import GcodeSender
+from controllers.grbl_emulator import GrblEmulator
+from processing.estimate import estimate_job
+from processing.job_file import JobFile
+
+
+class ScheduledJob:
+    """
+    Задание в очереди: отрезки, мощности и скорость плюс оценка длительности.
+    speeds — скорость каждого отрезка в шагах/с (0 — скорость speed), как в JobFile;
+    оценка для порядка очереди считается по скорости speed.
+    job_file — JobFile, из которого G-код строится порциями при передаче.
+    """
+
+    def __init__(self, name, segments, powers=None, speed=None, speeds=None, job_file=None):
+        self.name = name
+        self.segments = segments
+        self.powers = np.full(len(segments), config.MAX_POWER) if powers is None else powers
+        self.speeds = speeds
+        self.job_file = job_file
+        self.speed = speed or config.DEFAULT_SPEED  # Шагов в секунду
+        self.estimate = estimate_job(segments, units_per_second(self.speed))["total_time"]
+
+        self.machine = None
+        self.started = None
+        self.finished = None
+        self.result = None
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Задание из файла .lzjob, открытого через mmap. Контрольная сумма
+        не проверяется при открытии (это чтение всего файла), а проверяется
+        в verify() перед передачей на станок.
+        """
+        job_file = JobFile(path, verify=False)
+        return cls(Path(path).stem, job_file.segments, job_file.powers,
+                   job_file.speed or None, job_file.speeds, job_file)
+
+    def verify(self):
+        """Для задания из файла сверяет CRC записей; ValueError, если файл испорчен."""
+        if self.job_file is not None and not self.job_file.verify():
+            raise ValueError(f"Контрольная сумма файла задания не совпадает: {self.job_file.path}")
+
+    def gcode(self):
+        if self.job_file is not None:
+            return chunks_to_gcode(self.job_file.chunks(), self.speed)
+        return chunks_to_gcode([(self.segments, self.powers, self.speeds)], self.speed)
+
+
+class Machine:
+    """
+    Один станок: порт контроллера и учёт занятости.
+    Передача идёт обычным GcodeSender в отдельном потоке, поэтому
+    цикл событий не блокируется, пока станок исполняет задание.
+    """
+
+    def __init__(self, name, port):
+        self.name = name
+        self.port = port
+        self.sender = GcodeSender(port)
+        self.current = None
+        self.progress = (0, 0)  # (отправлено, подтверждено) строк текущего задания
+        self.jobs = 0
+        self.busy_time = 0.0
+        self.lines = 0
+        self.errors = []
+
+    def stream(self, job):
+        """Передаёт задание целиком (выполняется в потоке пула)."""
+        def progress(sent, acknowledged):
+            self.progress = (sent, acknowledged)
+
+        job.verify()  # Испорченный файл не доходит до контроллера
+
+        try:
+            return self.sender.stream(job.gcode(), progress)
+        except (TimeoutError, ValueError):
+            # Строки прерванного задания остались в контроллере без подтверждения:
+            # сбрасываем его, иначе их «ok» достанутся следующему заданию.
+            # Ошибка сброса не должна заслонить ошибку самого задания.
+            try:
+                self.sender.reset()
+            except (OSError, TimeoutError) as error:
+                self.errors.append(f"сброс контроллера: {error}")
+                print(f"⚠️ {self.name}: не удалось сбросить контроллер: {error}")
+            raise
+
+
+class JobScheduler:
+    """
+    Диспетчер заданий для нескольких станков на asyncio.
+
+    Свободный станок берёт из очереди самое длинное по оценке задание
+    (правило LPT: длинные задания раньше — меньше общее время работы цеха).
+    Для каждого станка работает своя корутина; передача G-кода идёт
+    в отдельном потоке на станок.
+    """
+
+    def __init__(self, machines):
+        self.machines = list(machines)
+        self.queue = asyncio.PriorityQueue()
+        self.order = itertools.count()  # Порядок постановки среди равных оценок
+        self.jobs = []
+        self.started = None
+        self.finished = None
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.machines)))
+
+    def submit(self, job):
+        """Ставит задание в очередь."""
+        self.jobs.append(job)
+        self.queue.put_nowait((0, -job.estimate, next(self.order), job))
+        return job
+
+    async def run(self):
+        """
+        Открывает порты станков и выполняет очередь до конца.
+        Задания, поставленные во время работы, тоже будут выполнены.
+        Возвращает отчёт utilisation().
+        """
+        # Признак конца очереди — по одному на станок, после всех заданий
+        for _ in self.machines:
+            self.queue.put_nowait((1, 0, next(self.order), None))
+
+        self.started = time.monotonic()
+        try:
+            for machine in self.machines:
+                machine.sender.open()
+            await asyncio.gather(*(self._worker(machine) for machine in self.machines))
+        finally:
+            for machine in self.machines:
+                machine.sender.close()
+            self.executor.shutdown(wait=False)
+        self.finished = time.monotonic()
+        return self.utilisation()
+
+    async def _worker(self, machine):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, _, job = await self.queue.get()
+            if job is None:
+                return
+
+            machine.current = job
+            machine.progress = (0, 0)
+            job.machine = machine.name
+            job.started = time.monotonic()
+            print(f"🔹 {machine.name}: {job.name} (оценка {job.estimate:.1f} с)")
+            try:
+                job.result = await loop.run_in_executor(self.executor, machine.stream, job)
+            except (OSError, TimeoutError, ValueError) as error:
+                job.result = {"error": str(error)}
+                machine.errors.append(f"{job.name}: {error}")
+                print(f"⚠️ {machine.name}: задание {job.name} прервано: {error}")
+            job.finished = time.monotonic()
+
+            machine.current = None
+            machine.jobs += 1
+            machine.busy_time += job.finished - job.started
+            machine.lines += job.result.get("lines", 0)
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def utilisation(self):
+        """Загрузка станков: число заданий, время работы и доля занятости от общего времени."""
+        elapsed = self.elapsed()
+        return {
+            machine.name: {
+                "jobs": machine.jobs,
+                "lines": machine.lines,
+                "busy_time": machine.busy_time,
+                "utilisation": machine.busy_time / elapsed if elapsed > 0 else 0.0,
+                "current": machine.current.name if machine.current else None,
+                "errors": list(machine.errors),
+            }
+            for machine in self.machines
+        }
+
+
+def start_emulated_machines(count, **emulator_options):
+    """
+    Запускает count эмуляторов GRBL и возвращает (machines, emulators).
+    Эмуляторы нужно остановить (emulator.stop()) после работы.
+    """
+    emulators = [GrblEmulator(**emulator_options).start() for _ in range(count)]
+    machines = [Machine(f"laser-{index + 1}", emulator.port) for index, emulator in enumerate(emulators)]
+    return machines, emulators
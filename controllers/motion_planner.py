@@ -0,0 +1,211 @@
+import bisect
+import math
+import threading
+
+
+class Block:
+    """Прямолинейный отрезок движения с рассчитанным трапециевидным профилем скорости."""
+    __slots__ = (
+        "x0", "y0", "x1", "y1", "length", "ux", "uy", "feed", "laser",
+        "max_entry", "entry_max", "exit_max", "entry", "exit",
+        "peak", "d_accel", "d_cruise", "t_accel", "t_cruise", "t_decel", "t_start", "t_end",
+    )
+
+    def __init__(self, x0, y0, x1, y1, feed, laser):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.length = math.hypot(x1 - x0, y1 - y0)
+        self.ux = (x1 - x0) / self.length
+        self.uy = (y1 - y0) / self.length
+        self.feed = feed
+        self.laser = laser
+        self.max_entry = 0.0  # Предел скорости на стыке с предыдущим отрезком
+        self.entry = 0.0
+        self.exit = 0.0
+
+    def compute_profile(self, acceleration):
+        """Разгон — равномерное движение — торможение между entry и exit."""
+        a = acceleration
+        v0, v1 = self.entry, self.exit
+        peak = self.feed
+        d_accel = (peak * peak - v0 * v0) / (2 * a)
+        d_decel = (peak * peak - v1 * v1) / (2 * a)
+        if d_accel + d_decel > self.length:
+            # Треугольный профиль: номинальная скорость не достигается
+            peak = math.sqrt(max((2 * a * self.length + v0 * v0 + v1 * v1) / 2, v0 * v0, v1 * v1))
+            d_accel = max(0.0, (peak * peak - v0 * v0) / (2 * a))
+            d_decel = max(0.0, (peak * peak - v1 * v1) / (2 * a))
+
+        self.peak = peak
+        self.d_accel = d_accel
+        self.d_cruise = max(0.0, self.length - d_accel - d_decel)
+        self.t_accel = (peak - v0) / a
+        self.t_cruise = self.d_cruise / peak if peak > 0 else 0.0
+        self.t_decel = (peak - v1) / a
+
+    def distance_at(self, tau, acceleration):
+        """Пройденный путь через tau секунд после начала отрезка."""
+        if tau <= self.t_accel:
+            return self.entry * tau + 0.5 * acceleration * tau * tau
+        tau -= self.t_accel
+        if tau <= self.t_cruise:
+            return self.d_accel + self.peak * tau
+        tau = min(tau - self.t_cruise, self.t_decel)
+        return self.d_accel + self.d_cruise + self.peak * tau - 0.5 * acceleration * tau * tau
+
+
+class MotionPlanner:
+    """
+    Планировщик движения с трапециевидным разгоном и просмотром вперёд (lookahead).
+
+    Очередь отрезков планируется в фоновом потоке порциями по chunk_size блоков,
+    с просмотром ещё lookahead блоков вперёд, поэтому длинные задания начинают
+    выполняться сразу. Положение вычисляется по прошедшему времени, а не по числу тиков.
+    """
+
+    def __init__(self, acceleration, junction_deviation, chunk_size=256, lookahead=256):
+        self.acceleration = acceleration
+        self.junction_deviation = junction_deviation
+        self.chunk_size = chunk_size
+        self.lookahead = lookahead
+
+        self.lock = threading.Lock()
+        self.thread = None
+        self.cancelled = False
+
+        self.start_point = (0.0, 0.0)
+        self.blocks = []      # Спланированные блоки (их профиль уже не меняется)
+        self.end_times = []   # Время окончания каждого блока — для двоичного поиска
+        self.done = True      # Все блоки спланированы
+
+    # ---------- Постановка задания ----------
+
+    def start(self, moves, start_point, feed):
+        """
+        Запускает планирование движений moves — последовательности (x, y, laser)
+        из точки start_point с номинальной скоростью feed (единиц/с).
+        """
+        self.cancel()
+        with self.lock:
+            self.start_point = start_point
+            self.blocks = []
+            self.end_times = []
+            self.done = False
+        self.cancelled = False
+        self.thread = threading.Thread(
+            target=self._plan_all, args=(list(moves), start_point, feed), daemon=True
+        )
+        self.thread.start()
+
+    def cancel(self):
+        """Останавливает фоновое планирование."""
+        self.cancelled = True
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        with self.lock:
+            self.done = True
+
+    # ---------- Планирование (фоновый поток) ----------
+
+    def _junction_speed(self, prev, block):
+        """Предельная скорость на стыке по методу отклонения (junction deviation)."""
+        cos_theta = -(prev.ux * block.ux + prev.uy * block.uy)
+        limit = min(prev.feed, block.feed)
+        if cos_theta < -0.9999:
+            return limit  # Движение по прямой
+        if cos_theta > 0.9999:
+            return 0.0    # Разворот на месте
+        sin_half = math.sqrt((1 - cos_theta) / 2)
+        v2 = self.acceleration * self.junction_deviation * sin_half / (1 - sin_half)
+        return min(limit, math.sqrt(v2))
+
+    def _build_blocks(self, moves, start_point, feed):
+        """Блоки всех движений; None, если планирование отменено по ходу построения."""
+        blocks = []
+        x, y = start_point
+        for index, (tx, ty, laser) in enumerate(moves):
+            if index % self.chunk_size == 0 and self.cancelled:
+                return None
+            if tx == x and ty == y:
+                continue
+            block = Block(x, y, tx, ty, feed, laser)
+            if blocks:
+                block.max_entry = self._junction_speed(blocks[-1], block)
+            blocks.append(block)
+            x, y = tx, ty
+        return blocks
+
+    def _plan_window(self, window, entry):
+        """Обратный и прямой проходы по окну; в конце окна предполагается остановка."""
+        a2 = 2 * self.acceleration
+        v_next = 0.0
+        for block in reversed(window):
+            block.exit_max = v_next
+            block.entry_max = min(block.max_entry, math.sqrt(v_next * v_next + a2 * block.length))
+            v_next = block.entry_max
+
+        v = min(entry, window[0].entry_max)
+        for block in window:
+            block.entry = v
+            block.exit = min(block.exit_max, math.sqrt(v * v + a2 * block.length))
+            v = block.exit
+
+    def _plan_all(self, moves, start_point, feed):
+        blocks = self._build_blocks(moves, start_point, feed)
+        if blocks is None:
+            return
+        entry = 0.0
+        t = 0.0
+        for i in range(0, len(blocks), self.chunk_size):
+            if self.cancelled:
+                return
+
+            window = blocks[i:i + self.chunk_size + self.lookahead]
+            self._plan_window(window, entry)
+
+            committed = window[:self.chunk_size]
+            for block in committed:
+                block.compute_profile(self.acceleration)
+                block.t_start = t
+                t += block.t_accel + block.t_cruise + block.t_decel
+                block.t_end = t
+
+            with self.lock:
+                self.blocks.extend(committed)
+                self.end_times.extend(b.t_end for b in committed)
+            entry = committed[-1].exit
+
+        with self.lock:
+            self.done = True
+
+    # ---------- Выборка положения ----------
+
+    def horizon(self):
+        """Возвращает (время окончания спланированной части, всё ли спланировано)."""
+        with self.lock:
+            return (self.end_times[-1] if self.end_times else 0.0), self.done
+
+    def sample(self, t):
+        """
+        Положение через t секунд после старта: (x, y, laser, index, finished),
+        где index — номер текущего блока. За пределами спланированной части
+        возвращается конец последнего готового блока.
+        """
+        with self.lock:
+            if not self.blocks:
+                x, y = self.start_point
+                return x, y, False, 0, self.done
+
+            index = bisect.bisect_right(self.end_times, t)
+            if index >= len(self.blocks):
+                last = self.blocks[-1]
+                return last.x1, last.y1, last.laser, len(self.blocks), self.done
+
+            block = self.blocks[index]
+
+        s = block.distance_at(max(0.0, t - block.t_start), self.acceleration)
+        return block.x0 + block.ux * s, block.y0 + block.uy * s, block.laser, index, False
+
+    def block(self, index):
+        with self.lock:
+            return self.blocks[index]
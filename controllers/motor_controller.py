@@ -1,7 +1,17 @@
+import time
+
+import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer
 
+import config
+import metrics
+from controllers.gcode import units_per_second
+from controllers.motion_planner import MotionPlanner
+from processing.estimate import estimate_job
+
 class MotorController(QObject):
-    position_changed = pyqtSignal(int, int)
+    position_changed = pyqtSignal(int, int)  # Не чаще раза в тик и только при смене положения
+    job_finished = pyqtSignal()
 
     def __init__(self, laser_view, field_size=(500, 500)):
         super().__init__()
@@ -9,68 +19,184 @@ class MotorController(QObject):
         self.y = 0
         self.target_x = 0
         self.target_y = 0
-        self.speed = 5
+        self.speed = config.DEFAULT_SPEED  # Шагов в секунду
         self.drawing = False  # Если True, добавляем точки в trail (лазер «включён»)
         self.field_width, self.field_height = field_size
         self.moving = False
+        self.job_running = False
+
+        # Планировщик считает положение по времени; таймер только опрашивает его
+        self.planner = MotionPlanner(config.MAX_ACCELERATION, config.JUNCTION_DEVIATION)
+        self.start_time = 0.0
+        self.block_index = 0  # Номер блока, на котором был предыдущий опрос
+        self.last_tick = None  # Время предыдущего тика — для метрики дрожания таймера
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_position)
 
+        # Точки следа текущего тика: передаются в LaserView одним пакетом в конце тика
+        self.trail_points = []
+        self.trail_breaks = []
+        self.trail_break = False
+        self.published = None  # Положение, последним переданное интерфейсу
+
         self.laser_view = laser_view
 
     def set_speed(self, speed: int):
-        self.speed = max(1, min(10, speed))
+        self.speed = max(config.MIN_SPEED, min(config.MAX_SPEED, speed))
+
+    def feed_rate(self):
+        """Номинальная скорость движения, единиц в секунду."""
+        return units_per_second(self.speed)
 
     def move_to(self, x: int, y: int):
         self.target_x = max(0, min(self.field_width, x))
         self.target_y = max(0, min(self.field_height, y))
+        self.job_running = False
+        self.start_moves([(self.target_x, self.target_y, self.drawing)])
+
+    def run_segments(self, segments):
+        """
+        Запускает задание из отрезков прожига (x0, y0, x1, y1).
+        Между несмежными отрезками головка переезжает с выключенным лазером.
+        """
+        moves = []
+        last = (self.x, self.y)
+        for x0, y0, x1, y1 in segments:
+            start = (self.clamp_x(x0), self.clamp_y(y0))
+            end = (self.clamp_x(x1), self.clamp_y(y1))
+            if start != last:
+                moves.append((*start, False))
+            moves.append((*end, True))
+            last = end
+
+        if moves:
+            self.target_x, self.target_y = last
+        self.job_running = True
+        self.start_moves(moves)
+
+    def estimate_segments(self, segments, speed=None):
+        """
+        Оценка времени задания из отрезков при скорости speed (по умолчанию текущей)
+        от текущего положения головки — без запуска движения.
+        """
+        segments = np.clip(segments, 0, [self.field_width, self.field_height] * 2)
+        feed = units_per_second(speed or self.speed)
+        return estimate_job(segments, feed, self.planner.acceleration,
+                            self.planner.junction_deviation, start=(self.x, self.y))
+
+    def clamp_x(self, x):
+        return max(0, min(self.field_width, int(x)))
+
+    def clamp_y(self, y):
+        return max(0, min(self.field_height, int(y)))
+
+    def start_moves(self, moves):
+        """Передаёт движения планировщику и запускает опрос положения по таймеру."""
+        self.planner.start(moves, (self.x, self.y), self.feed_rate())
+        self.start_time = time.monotonic()
+        self.block_index = 0
+        self.last_tick = None
         self.moving = True
-        self.timer.start(30)  # Запускаем таймер на 30 мс
+        self.timer.start(config.TICK_MS)
+
+    def trace_block(self, laser, x, y):
+        """Добавляет точку в «след» с учётом включения/выключения лазера."""
+        if laser != self.drawing:
+            self.trail_break = True  # разрыв
+            self.drawing = laser
+        if self.drawing:
+            self.trail_points += (int(x), int(y))
+            self.trail_breaks.append(self.trail_break)
+            self.trail_break = False
+
+    def flush_trail(self):
+        """Передаёт точки следа, накопленные за тик, в LaserView одним пакетом (одна перерисовка)."""
+        if self.trail_breaks:
+            self.laser_view.add_trail_batch(self.trail_points, self.trail_breaks)
+            self.trail_points = []
+            self.trail_breaks = []
+        if self.trail_break:
+            self.laser_view.add_trail(None, None)  # разрыв
+            self.trail_break = False
+
+    def publish_position(self, x, y):
+        """Двигает точку лазера и сообщает координаты, только если положение изменилось."""
+        if (x, y) == self.published:
+            return
+        self.published = (x, y)
+        self.laser_view.update_position(x, y)
+        self.position_changed.emit(x, y)
 
+    @metrics.timed("lazer_motor_tick_seconds")
     def update_position(self):
+        if metrics.enabled:
+            tick = metrics.now()
+            if self.last_tick is not None:
+                metrics.observe("lazer_motor_tick_jitter_seconds",
+                                abs(tick - self.last_tick - config.TICK_MS / 1000))
+            self.last_tick = tick
+
         if not self.moving:
             self.timer.stop()
             return
 
-        dx = self.target_x - self.x
-        dy = self.target_y - self.y
-        dist = (dx**2 + dy**2) ** 0.5
-
-        if dist < self.speed:
-            self.x = self.target_x
-            self.y = self.target_y
+        # Если фоновое планирование отстаёт, не даём часам убежать вперёд
+        elapsed = time.monotonic() - self.start_time
+        planned, done = self.planner.horizon()
+        if not done and elapsed > planned:
+            self.start_time += elapsed - planned
+            elapsed = planned
+
+        x, y, laser, index, finished = self.planner.sample(elapsed)
+
+        if self.job_running:
+            # Блоки, пройденные целиком с прошлого опроса: сохраняем их углы в «следе»
+            for i in range(self.block_index, index):
+                block = self.planner.block(i)
+                if block.laser and not self.drawing:
+                    self.trace_block(True, block.x0, block.y0)
+                self.trace_block(block.laser, block.x1, block.y1)
+            if not finished and laser != self.drawing:
+                block = self.planner.block(index)
+                self.trace_block(laser, block.x0, block.y0)
+        elif self.drawing:
+            # Ручное перемещение: лазер включают и выключают кнопкой прямо
+            # во время движения, поэтому важен текущий drawing, а не блоков
+            for i in range(self.block_index, index):
+                block = self.planner.block(i)
+                self.trace_block(True, block.x1, block.y1)
+        self.block_index = index
+
+        self.x, self.y = x, y
+
+        # Один пакет следа и одно обновление положения за тик
+        if self.drawing and not finished:
+            self.trace_block(self.drawing, self.x, self.y)
+        self.flush_trail()
+        self.publish_position(int(self.x), int(self.y))
+
+        if finished:
             self.moving = False
             self.timer.stop()
-        else:
-            step_x = self.speed * (dx / dist)
-            step_y = self.speed * (dy / dist)
-            self.x += step_x
-            self.y += step_y
-
-        # Сообщаем GUI о новых координатах
-        self.position_changed.emit(int(self.x), int(self.y))
-        # Обновляем положение красной точки в LaserView
-        self.laser_view.update_position(int(self.x), int(self.y))
-
-        # Если лазер включён, рисуем «след»
-        if self.drawing:
-            self.laser_view.add_trail(int(self.x), int(self.y))
-
-
+            if self.job_running:
+                self.job_running = False
+                self.drawing = False
+                self.job_finished.emit()
 
     def stop(self):
+        self.planner.cancel()
         self.moving = False
+        self.job_running = False
         self.timer.stop()
 
     def reset_position(self):
+        self.planner.cancel()
         self.x, self.y = 0, 0
         self.target_x, self.target_y = 0, 0
         self.moving = False
+        self.job_running = False
         self.timer.stop()
 
-        # Обновить виджет сразу на (0,0)
-        self.laser_view.update_position(0, 0)
-
-        # Также послать сигнал, чтобы обновить текст метки
-        self.position_changed.emit(0, 0)
+        # Обновить виджет и текст метки сразу на (0,0)
+        self.publish_position(0, 0)
@@ -1,19 +1,30 @@
 from PyQt6.QtGui import QImage
 import numpy as np
 
+from processing.extraction import extract_points, MODE_LIGHTNESS
+
+
 class Scanner:
-    def __init__(self, image_path):
+    def __init__(self, image_path, threshold=127, mode=MODE_LIGHTNESS):
         self.image = QImage(image_path)
+        self.threshold = threshold  # Пиксели с яркостью <= threshold считаются тёмными
+        self.mode = mode
 
-    def analyze_image(self):
-        width = self.image.width()
-        height = self.image.height()
-        points = []
+    def to_array(self):
+        """Возвращает пиксели QImage как массив h×w×4 (BGRA) без попиксельных вызовов."""
+        image = self.image.convertToFormat(QImage.Format.Format_ARGB32)
+        width = image.width()
+        height = image.height()
 
-        for y in range(height):
-            for x in range(width):
-                pixel = self.image.pixelColor(x, y).lightness()  # Яркость пикселя
-                if pixel < 128:  # Если пиксель тёмный, записываем его координаты
-                    points.append((x, y))
+        ptr = image.constBits()
+        ptr.setsize(image.sizeInBytes())
+        rows = np.frombuffer(ptr, dtype=np.uint8).reshape(height, image.bytesPerLine())
+        # Копируем, чтобы массив не зависел от времени жизни QImage
+        return rows[:, :width * 4].reshape(height, width, 4).copy()
+
+    def analyze_image(self):
+        if self.image.isNull():
+            return np.empty((0, 2), dtype=np.int32)
 
-        return points  # Список точек для обработки
+        # Массив (N, 2) координат тёмных пикселей для обработки
+        return extract_points(self.to_array(), self.threshold, self.mode)
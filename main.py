@@ -1,12 +1,18 @@
 import sys
 from PyQt6.QtWidgets import QApplication
 from ui.main_window import MainWindow
+import config
+import metrics
 
 def main():
     app = QApplication(sys.argv)
+    metrics.configure()
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    code = app.exec()
+    if metrics.enabled and config.METRICS_FILE:
+        metrics.write_text(config.METRICS_FILE)
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,185 @@
+"""
+Метрики горячих путей: гистограммы в памяти процесса и выгрузка
+в текстовом формате Prometheus (в файл или по HTTP).
+
+Включаются переменной окружения LAZER_METRICS=1 (см. config). Выключенные
+метрики стоят одну проверку флага: места замеров пишут
+
+    if metrics.enabled:
+        metrics.observe("name", value)
+
+или используют декоратор @metrics.timed(...), который при выключенных
+метриках сразу вызывает функцию.
+"""
+import bisect
+import functools
+import threading
+import time
+
+import config
+
+enabled = False
+
+# Границы корзин, секунды: от 0.1 мс до 10 с
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Имя -> (описание, границы корзин)
+DEFINITIONS = {
+    "lazer_motor_tick_jitter_seconds": (
+        "Отклонение интервала между тиками MotorController.update_position от TICK_MS", TIME_BUCKETS),
+    "lazer_motor_tick_seconds": ("Длительность одного тика MotorController.update_position", TIME_BUCKETS),
+    "lazer_paint_seconds": ("Время кадра LaserView.paintEvent", TIME_BUCKETS),
+    "lazer_image_stage_seconds": ("Время этапов обработки в ImageLoader", TIME_BUCKETS),
+    "lazer_animate_seconds": ("Время одного кадра MainWindow.animate_laser", TIME_BUCKETS),
+    "lazer_animate_points": ("Точек, прожжённых за один кадр animate_laser", COUNT_BUCKETS),
+}
+
+now = time.perf_counter
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами: count, sum и счётчики по корзинам."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Последняя — выше всех границ
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+_histograms = {}  # (имя, метки) -> Histogram
+_lock = threading.Lock()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def observe(name, value, **labels):
+    """Добавляет наблюдение в гистограмму name с метками labels."""
+    if not enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(DEFINITIONS[name][1])
+        histogram.observe(value)
+
+
+def timed(name, **labels):
+    """Декоратор: время вызова функции в гистограмму name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            started = now()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, now() - started, **labels)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """Копия всех гистограмм: {(имя, метки): Histogram}."""
+    with _lock:
+        result = {}
+        for key, histogram in _histograms.items():
+            copy = Histogram(histogram.buckets)
+            copy.counts = list(histogram.counts)
+            copy.count = histogram.count
+            copy.sum = histogram.sum
+            result[key] = copy
+        return result
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+def render_text():
+    """Все гистограммы в текстовом формате Prometheus."""
+    lines = []
+    by_name = {}
+    for (name, labels), histogram in sorted(snapshot().items()):
+        by_name.setdefault(name, []).append((labels, histogram))
+
+    for name, series in by_name.items():
+        lines.append(f"# HELP {name} {DEFINITIONS[name][0]}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', repr(float(bound)))])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_text(path):
+    """Сохраняет метрики в файл (формат Prometheus, удобно для node_exporter textfile)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_text())
+
+
+def serve(port, host="127.0.0.1"):
+    """Запускает HTTP-эндпоинт /metrics в фоновом потоке; возвращает сервер."""
+    # http.server заметно удлиняет запуск, а нужен только с LAZER_METRICS_PORT
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Без записи каждого опроса в консоль
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure():
+    """Включает метрики и выгрузку по настройкам из config."""
+    if not config.METRICS_ENABLED:
+        return None
+    enable()
+    server = None
+    if config.METRICS_PORT:
+        server = serve(config.METRICS_PORT)
+        print(f"🔹 Метрики: http://127.0.0.1:{config.METRICS_PORT}/metrics")
+    return server
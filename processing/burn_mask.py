@@ -0,0 +1,141 @@
+import cv2
+import numpy as np
+
+from processing.extraction import coordinate_dtype, mask_to_points
+from processing.job_cache import pack_mask, unpack_mask
+
+BAND_ROWS = 1024  # Строк маски, распаковываемых за один раз
+
+# Число единичных битов в каждом значении байта
+_BIT_COUNTS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def display_size(width, height, max_height):
+    """Размер показа (ширина, высота), как у ScaledImage: по высоте не больше max_height."""
+    if height > max_height:
+        return max(1, int(width * max_height / height)), max_height
+    return width, height
+
+
+def mask_preview(read_rows, shape, max_height):
+    """
+    Маска в размере показа: uint8, 0 — прожиг, 255 — фон, промежуточные
+    значения — доля прожигаемых пикселей (как cv2.INTER_AREA).
+    read_rows(top, bottom) возвращает полосу маски (bool), поэтому
+    маска целиком не распаковывается.
+    """
+    height, width = shape
+    size = display_size(width, height, max_height)
+    preview = np.empty((size[1], size[0]), dtype=np.uint8)
+    step = max(1, BAND_ROWS * size[1] // max(1, height))
+    for top in range(0, size[1], step):
+        bottom = min(size[1], top + step)
+        src_top = top * height // size[1]
+        src_bottom = min(height, -(-bottom * height // size[1]))
+        band = np.where(read_rows(src_top, src_bottom), 0, 255).astype(np.uint8)
+        cv2.resize(band, (size[0], bottom - top), dst=preview[top:bottom], interpolation=cv2.INTER_AREA)
+    return preview
+
+
+class MaskPreview:
+    """
+    Превью маски в размере показа, которое обновляется по отдельным пикселям.
+
+    Каждая клетка превью хранит число прожигаемых пикселей своего блока
+    (как холст BurnPreview); при смене порога меняются только клетки
+    изменившихся пикселей, а маска полного разрешения заново не уменьшается.
+    """
+
+    def __init__(self, mask, max_height):
+        height, width = mask.shape
+        columns, rows = display_size(width, height, max_height)
+        self.width = width
+        # Клетка превью для каждой строки и столбца маски
+        self.row_map = np.arange(height, dtype=np.intp) * rows // height
+        self.column_map = np.arange(width, dtype=np.intp) * columns // width
+        self.area = np.outer(np.bincount(self.row_map, minlength=rows),
+                             np.bincount(self.column_map, minlength=columns))
+
+        row_starts = np.searchsorted(self.row_map, np.arange(rows))
+        column_starts = np.searchsorted(self.column_map, np.arange(columns))
+        self.counts = np.add.reduceat(mask, row_starts, axis=0, dtype=np.int64)
+        self.counts = np.add.reduceat(self.counts, column_starts, axis=1)
+        self.image = np.empty((rows, columns), dtype=np.uint8)
+        self._render(0, rows)
+
+    def update(self, indices, dark):
+        """Пиксели с плоскими номерами indices стали прожигаемыми (dark) или фоном."""
+        if len(indices) == 0:
+            return
+        ys, xs = np.divmod(indices, self.width)
+        rows = self.row_map[ys]
+        first, last = int(rows.min()), int(rows.max()) + 1
+        columns = self.image.shape[1]
+        delta = np.bincount((rows - first) * columns + self.column_map[xs], minlength=(last - first) * columns)
+        delta = delta.reshape(last - first, columns)
+        if dark:
+            self.counts[first:last] += delta
+        else:
+            self.counts[first:last] -= delta
+        self._render(first, last)
+
+    def _render(self, first, last):
+        self.image[first:last] = 255 - self.counts[first:last] * 255 // self.area[first:last]
+
+
+class BurnMask:
+    """
+    Маска прожига, упакованная по битам: 1 бит на пиксель (8 пикселей строки в байте).
+
+    Основное представление обработанного задания в памяти. Бинарное
+    изображение, точки и превью получаются из неё по требованию,
+    полосами по BAND_ROWS строк, без распаковки маски целиком.
+    """
+
+    def __init__(self, packed, shape):
+        self.packed = packed
+        self.shape = tuple(int(value) for value in shape)
+
+    @classmethod
+    def from_mask(cls, mask):
+        mask = np.asarray(mask, dtype=bool)
+        return cls(pack_mask(mask), mask.shape)
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def count(self):
+        """Число прожигаемых пикселей."""
+        return int(_BIT_COUNTS[self.packed].sum(dtype=np.int64))
+
+    def rows(self, top, bottom):
+        """Полоса маски (bool) со строки top по bottom (не включая)."""
+        bottom = min(bottom, self.shape[0])
+        return unpack_mask(self.packed[top:bottom], (bottom - top, self.shape[1]))
+
+    def unpack(self):
+        return self.rows(0, self.shape[0])
+
+    def binary_image(self):
+        """Бинарное изображение uint8 (0 — прожиг, 255 — фон) в полном разрешении."""
+        return np.where(self.unpack(), 0, 255).astype(np.uint8)
+
+    def points(self):
+        """
+        Координаты (N, 2) прожигаемых пикселей в построчном порядке,
+        в компактном типе (uint16, для сторон больше 65536 — uint32).
+        """
+        height, width = self.shape
+        points = np.empty((self.count(), 2), dtype=coordinate_dtype(width, height))
+        offset = 0
+        for top in range(0, height, BAND_ROWS):
+            band = mask_to_points(self.rows(top, top + BAND_ROWS), points.dtype)
+            band[:, 1] += top
+            points[offset:offset + len(band)] = band
+            offset += len(band)
+        return points
+
+    def preview(self, max_height):
+        """Превью маски в размере показа, см. mask_preview()."""
+        return mask_preview(self.rows, self.shape, max_height)
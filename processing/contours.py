@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+
+def extract_contours(binary_image, epsilon=1.0, min_points=2):
+    """
+    Находит контуры чёрных областей бинарного изображения и упрощает их
+    до ломаных (алгоритм Дугласа — Пекера с допуском epsilon в пикселях).
+
+    Возвращает список замкнутых ломаных — массивов (K, 2) int32 с вершинами (x, y).
+    """
+    foreground = (np.asarray(binary_image) == 0).astype(np.uint8)
+    contours, _ = cv2.findContours(foreground, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+
+    polylines = []
+    for contour in contours:
+        simplified = cv2.approxPolyDP(contour, epsilon, True).reshape(-1, 2)
+        if len(simplified) >= min_points:
+            polylines.append(simplified.astype(np.int32))
+    return polylines
+
+
+def _nearest_neighbour(polylines, start):
+    """
+    Жадный обход: каждый раз едем к ближайшей вершине ещё не пройденного контура.
+    Контур замкнут, поэтому в него можно войти с любой вершины.
+    Возвращает порядок контуров и номер вершины входа для каждого.
+    """
+    vertices = np.concatenate(polylines).astype(np.float64)
+    owner = np.repeat(np.arange(len(polylines)), [len(p) for p in polylines])
+    offsets = np.concatenate(([0], np.cumsum([len(p) for p in polylines])[:-1]))
+    alive = np.ones(len(vertices), dtype=bool)
+
+    order = []
+    entries = []
+    position = np.asarray(start, dtype=np.float64)
+    for _ in range(len(polylines)):
+        dist = np.hypot(*(vertices - position).T)
+        dist[~alive] = np.inf
+        nearest = int(np.argmin(dist))
+        index = int(owner[nearest])
+
+        order.append(index)
+        entries.append(nearest - offsets[index])
+        alive[owner == index] = False
+        position = vertices[nearest]
+
+    return np.array(order), np.array(entries)
+
+
+def _two_opt(points, max_passes=10):
+    """
+    Улучшение маршрута перестановкой 2-opt для открытого пути через точки входа.
+    points[0] — неподвижная стартовая позиция. Возвращает новый порядок индексов.
+    """
+    route = np.arange(len(points))
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, len(route) - 1):
+            p = points[route]
+            a = p[i - 1]
+            b = p[i]
+            c = p[i:]  # кандидаты на конец разворачиваемого участка (j >= i)
+            d = np.vstack((p[i + 1:], [[np.nan, np.nan]]))
+
+            old = np.hypot(*(a - b)) + np.nan_to_num(np.hypot(*(c - d).T))
+            new = np.hypot(*(c - a).T) + np.nan_to_num(np.hypot(*(d - b).T))
+            delta = new - old
+
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                route[i:i + j + 1] = route[i:i + j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return route
+
+
+def order_polylines(polylines, start=(0, 0), max_passes=10):
+    """
+    Упорядочивает контуры так, чтобы сократить холостые перемещения:
+    ближайший сосед, затем улучшение 2-opt. Каждый контур поворачивается
+    так, чтобы начинаться с вершины входа.
+    """
+    if not polylines:
+        return []
+
+    order, entries = _nearest_neighbour(polylines, start)
+
+    entry_points = np.array([polylines[i][e] for i, e in zip(order, entries)], dtype=np.float64)
+    route = _two_opt(np.vstack(([start], entry_points)), max_passes)[1:] - 1
+
+    return [np.roll(polylines[order[k]], -entries[k], axis=0) for k in route]
+
+
+def polylines_to_segments(polylines):
+    """Переводит замкнутые ломаные в отрезки прожига (x0, y0, x1, y1) с замыканием контура."""
+    if not polylines:
+        return np.empty((0, 4), dtype=np.int32)
+
+    parts = [np.hstack((p, np.roll(p, -1, axis=0))) for p in polylines]
+    return np.concatenate(parts).astype(np.int32)
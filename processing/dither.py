@@ -0,0 +1,97 @@
+import numpy as np
+
+# Способы получения маски прожига из полутонового изображения
+DITHER_NONE = "threshold"           # Жёсткий порог
+DITHER_BAYER = "bayer"              # Упорядоченный (матрица Байера)
+DITHER_FLOYD_STEINBERG = "floyd-steinberg"
+DITHER_JARVIS = "jarvis"            # Jarvis — Judice — Ninke
+DITHER_POWER = "power"              # Мощность лазера по яркости пикселя
+DITHER_MODES = (DITHER_NONE, DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS, DITHER_POWER)
+
+# Ядра диффузии ошибки: (dy, dx, вес) и «наклон» волнового фронта k
+FLOYD_STEINBERG = (
+    [(0, 1, 7), (1, -1, 3), (1, 0, 5), (1, 1, 1)], 16, 2,
+)
+JARVIS = (
+    [(0, 1, 7), (0, 2, 5),
+     (1, -2, 3), (1, -1, 5), (1, 0, 7), (1, 1, 5), (1, 2, 3),
+     (2, -2, 1), (2, -1, 3), (2, 0, 5), (2, 1, 3), (2, 2, 1)], 48, 3,
+)
+
+POWER_LEVELS = 16  # Ступеней мощности в режиме DITHER_POWER
+
+
+def bayer_matrix(order):
+    """Матрица Байера размером 2^order × 2^order со значениями 0..n²-1."""
+    matrix = np.zeros((1, 1), dtype=np.int32)
+    for _ in range(order):
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return matrix
+
+
+def ordered_dither(gray, order=3):
+    """Упорядоченный дизеринг: сравнение с повторённой матрицей порогов, полностью векторно."""
+    matrix = bayer_matrix(order)
+    n = matrix.shape[0]
+    thresholds = ((matrix + 0.5) * (256 / (n * n))).astype(np.float32)
+    height, width = gray.shape
+    tiled = np.tile(thresholds, (-(-height // n), -(-width // n)))[:height, :width]
+    return gray < tiled
+
+
+def error_diffusion(gray, kernel=FLOYD_STEINBERG):
+    """
+    Диффузия ошибки (Флойд — Стейнберг, Jarvis) без попиксельного цикла.
+
+    Пиксель (y, x) зависит только от пикселей с меньшим t = x + k·y, поэтому
+    все пиксели одной «волны» t обрабатываются одной векторной операцией.
+    Число волн — ширина + k·высота, а не число пикселей.
+    Возвращает маску прожигаемых (чёрных) пикселей.
+    """
+    taps, divisor, k = kernel
+    height, width = gray.shape
+    pad = max(abs(dx) for _, dx, _ in taps)
+    stride = width + 2 * pad
+
+    buffer = np.zeros((height + 2) * stride, dtype=np.float32)
+    buffer.reshape(height + 2, stride)[:height, pad:pad + width] = gray
+    dark = np.zeros(height * width, dtype=bool)
+    offsets = [(dy * stride + dx, weight / divisor) for dy, dx, weight in taps]
+
+    all_rows = np.arange(height)
+    for t in range(width + k * (height - 1)):
+        first = max(0, -(-(t - width + 1) // k))
+        last = min(height - 1, t // k)
+        ys = all_rows[first:last + 1]
+        xs = t - k * ys
+
+        index = ys * stride + xs + pad
+        old = buffer[index]
+        black = old < 128
+        dark[ys * width + xs] = black
+        error = old - np.where(black, 0, 255)
+        for offset, weight in offsets:
+            buffer[index + offset] += error * weight
+
+    return dark.reshape(height, width)
+
+
+def power_levels(gray, levels=POWER_LEVELS):
+    """
+    Ступень мощности 0..levels для каждого пикселя: чем темнее, тем сильнее.
+    0 — пиксель не прожигается.
+    """
+    return np.rint((255 - gray.astype(np.float32)) * (levels / 255)).astype(np.uint8)
+
+
+def dither_mask(gray, mode):
+    """Маска прожига для способа mode (кроме DITHER_NONE, где нужен порог)."""
+    if mode == DITHER_BAYER:
+        return ordered_dither(gray)
+    if mode == DITHER_FLOYD_STEINBERG:
+        return error_diffusion(gray, FLOYD_STEINBERG)
+    if mode == DITHER_JARVIS:
+        return error_diffusion(gray, JARVIS)
+    if mode == DITHER_POWER:
+        return power_levels(gray) > 0
+    raise ValueError(f"Неизвестный способ дизеринга: {mode}")
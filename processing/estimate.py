@@ -0,0 +1,120 @@
+import numpy as np
+
+import config
+
+
+def job_moves(segments, start=(0, 0)):
+    """
+    Разворачивает отрезки прожига в последовательность движений, как это делает
+    MotorController.run_segments: переезд к началу несмежного отрезка и прожиг.
+    Возвращает (targets (K, 2) float64, laser (K,) bool, segment (K,) — номер отрезка,
+    к которому относится движение); движения нулевой длины отброшены.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    origin = np.asarray(start, dtype=np.float64).reshape(1, 2)
+    previous = np.vstack([origin, segments[:-1, 2:]])
+    travel = np.any(segments[:, :2] != previous, axis=1)
+
+    # В segments.reshape(-1, 2) чётные строки — начала отрезков, нечётные — концы
+    keep = np.ones(2 * len(segments), dtype=bool)
+    keep[0::2] = travel
+    index = np.flatnonzero(keep)
+    targets = segments.reshape(-1, 2)[index]
+    laser = (index & 1).astype(bool)
+    segment = index >> 1
+
+    # Движение на месте ничего не меняет: предыдущие цели при этом остаются прежними
+    moving = np.any(targets != np.vstack([origin, targets[:-1]]), axis=1)
+    return targets[moving], laser[moving], segment[moving]
+
+
+def laser_switches(segments):
+    """Число включений и выключений лазера: каждая группа смежных отрезков — одно включение."""
+    segments = np.asarray(segments).reshape(-1, 4)
+    if len(segments) == 0:
+        return 0
+    # Первый отрезок всегда начинает группу, даже если головка уже в его начале
+    groups = 1 + int(np.count_nonzero(np.any(segments[1:, :2] != segments[:-1, 2:], axis=1)))
+    return 2 * groups
+
+
+def junction_limits(directions, feed, acceleration, junction_deviation):
+    """Квадраты предельных скоростей на стыках движений (как MotionPlanner._junction_speed)."""
+    cos_theta = -np.einsum("ij,ij->i", directions[:-1], directions[1:])
+    cos_theta = np.clip(cos_theta, -1.0, 1.0)
+    sin_half = np.sqrt((1 - cos_theta) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v2 = acceleration * junction_deviation * sin_half / (1 - sin_half)
+    v2 = np.minimum(np.nan_to_num(v2, nan=0.0, posinf=feed * feed), feed * feed)
+    v2[cos_theta < -0.9999] = feed * feed  # Движение по прямой
+    v2[cos_theta > 0.9999] = 0.0           # Разворот на месте
+    return v2
+
+
+def plan_moves(segments, feed, acceleration=config.MAX_ACCELERATION,
+               junction_deviation=config.JUNCTION_DEVIATION, start=(0, 0)):
+    """
+    Профиль скорости всего задания за один векторный проход.
+
+    Модель та же, что у MotionPlanner (трапеция, отклонение на стыках), но обратный
+    и прямой проходы записаны в квадратах скоростей как накопленные минимумы,
+    поэтому считаются за O(N) без цикла по блокам. Планировщик останавливает
+    головку в конце окна просмотра вперёд, поэтому реальное время может быть
+    немного больше.
+
+    Возвращает (laser, lengths, times, segment) по движениям из job_moves().
+    """
+    targets, laser, segment = job_moves(segments, start)
+    origin = np.vstack([np.asarray(start, dtype=np.float64).reshape(1, 2), targets[:-1]])
+    delta = targets - origin
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    if len(lengths) == 0:
+        return laser, lengths, lengths.copy(), segment
+
+    a2 = 2.0 * acceleration
+    # Узлы 0..K: начало, стыки движений, конец. В начале и в конце — остановка.
+    limits = np.zeros(len(lengths) + 1)
+    limits[1:-1] = junction_limits(delta / lengths[:, None], feed, acceleration, junction_deviation)
+    distance = np.concatenate([[0.0], np.cumsum(lengths)])
+
+    # Обратный проход: v²[i] = min по k >= i (limit[k] + 2a·(S[k] − S[i]))
+    backward = np.minimum.accumulate((limits + a2 * distance)[::-1])[::-1] - a2 * distance
+    # Прямой проход: v²[i] = min по k <= i (backward[k] + 2a·(S[i] − S[k]))
+    v2 = np.minimum.accumulate(backward - a2 * distance) + a2 * distance
+    v2 = np.maximum(v2, 0.0)
+
+    v0, v1 = v2[:-1], v2[1:]
+    peak2 = np.minimum(feed * feed, (a2 * lengths + v0 + v1) / 2)
+    peak2 = np.maximum(peak2, np.maximum(v0, v1))
+    peak = np.sqrt(peak2)
+    cruise = np.maximum(lengths - (2 * peak2 - v0 - v1) / a2, 0.0)
+    times = (2 * peak - np.sqrt(v0) - np.sqrt(v1)) / acceleration + cruise / peak
+    return laser, lengths, times, segment
+
+
+def estimate_job(segments, feed, acceleration=config.MAX_ACCELERATION,
+                 junction_deviation=config.JUNCTION_DEVIATION, start=(0, 0)):
+    """
+    Оценка длительности задания без пошаговой симуляции (см. plan_moves).
+
+    feed — номинальная скорость (единиц/с), acceleration — единиц/с².
+    Возвращает словарь с временами (с), длинами и числом переключений лазера.
+    """
+    laser, lengths, times, _ = plan_moves(segments, feed, acceleration, junction_deviation, start)
+    burn_time = float(times[laser].sum())
+    travel_time = float(times[~laser].sum())
+    return {
+        "moves": len(lengths),
+        "burn_length": float(lengths[laser].sum()),
+        "travel_length": float(lengths[~laser].sum()),
+        "laser_switches": laser_switches(segments),
+        "burn_time": burn_time,
+        "travel_time": travel_time,
+        "total_time": burn_time + travel_time,
+    }
+
+
+def format_duration(seconds):
+    """Длительность в виде Ч:ММ:СС."""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
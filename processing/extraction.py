@@ -0,0 +1,56 @@
+import numpy as np
+
+# Режимы перевода цвета в яркость
+MODE_LIGHTNESS = "lightness"  # (max(R, G, B) + min(R, G, B)) / 2, как QColor.lightness()
+MODE_LUMA = "luma"            # 0.299 R + 0.587 G + 0.114 B, как cv2.COLOR_BGR2GRAY
+
+DEFAULT_THRESHOLD = 127
+
+
+def to_gray(image, mode=MODE_LUMA):
+    """
+    Переводит изображение (h×w, h×w×3 BGR или h×w×4 BGRA) в массив яркости uint8.
+    Одноканальное изображение возвращается без копирования.
+    """
+    image = np.asarray(image)
+    if image.ndim == 2:
+        return image
+
+    bgr = image[..., :3]
+    if mode == MODE_LIGHTNESS:
+        hi = bgr.max(axis=2).astype(np.uint16)
+        lo = bgr.min(axis=2).astype(np.uint16)
+        return ((hi + lo) // 2).astype(np.uint8)
+    if mode == MODE_LUMA:
+        weights = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+        gray = bgr.astype(np.float32) @ weights
+        return np.rint(gray).astype(np.uint8)
+
+    raise ValueError(f"Неизвестный режим яркости: {mode}")
+
+
+def dark_mask(image, threshold=DEFAULT_THRESHOLD, mode=MODE_LUMA):
+    """Булева маска пикселей, которые нужно прожечь (яркость <= threshold)."""
+    return to_gray(image, mode) <= threshold
+
+
+def coordinate_dtype(width, height):
+    """Наименьший тип для координат изображения width×height: uint16 или uint32."""
+    return np.uint16 if max(width, height) <= 1 << 16 else np.uint32
+
+
+def mask_to_points(mask, dtype=np.int32):
+    """
+    Возвращает массив (N, 2) dtype с координатами (x, y) истинных пикселей маски.
+    Порядок — построчный (сначала y, затем x), как у прежнего двойного цикла.
+    """
+    ys, xs = np.nonzero(mask)
+    points = np.empty((len(xs), 2), dtype=dtype)
+    points[:, 0] = xs
+    points[:, 1] = ys
+    return points
+
+
+def extract_points(image, threshold=DEFAULT_THRESHOLD, mode=MODE_LUMA):
+    """Находит тёмные пиксели изображения и возвращает их координаты (N, 2)."""
+    return mask_to_points(dark_mask(image, threshold, mode))
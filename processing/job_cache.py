@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+import config
+
+CACHE_VERSION = 1  # Меняется при несовместимом изменении формата записей
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 содержимого файла: одинаковые изображения дают один ключ, где бы они ни лежали."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pack_mask(mask):
+    """Бинарная маска h×w -> 1 бит на пиксель."""
+    return np.packbits(np.asarray(mask, dtype=bool), axis=1)
+
+
+def unpack_mask(packed, shape):
+    return np.unpackbits(packed, axis=1, count=shape[1]).astype(bool)
+
+
+class JobCache:
+    """
+    Кэш обработанных заданий на диске, адресуемый по содержимому.
+
+    Ключ — хэш файла изображения плюс параметры обработки (порог, режим и т.п.).
+    Запись — несжатый .npz с упакованной по битам маской и траекторией.
+    Размер кэша ограничен max_bytes: при переполнении удаляются записи,
+    к которым дольше всего не обращались (время изменения файла обновляется
+    при каждом попадании).
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or config.CACHE_DIR
+        self.max_bytes = config.CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(digest, **params):
+        payload = json.dumps({"v": CACHE_VERSION, "file": digest, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key, required=()):
+        """
+        Возвращает словарь массивов записи или None, если записи нет.
+        Повреждённая запись (обрезанный архив, нет какого-то из массивов required)
+        удаляется и считается промахом, чтобы следующая обработка записала её заново.
+        """
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            for name in required:
+                if name not in arrays:
+                    raise KeyError(name)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile) as error:
+            print(f"⚠️ Повреждённая запись кэша удалена: {os.path.basename(path)} ({error!r})")
+            self.discard(path)
+            self.misses += 1
+            return None
+
+        os.utime(path)  # Отмечаем использование для LRU
+        self.hits += 1
+        return arrays
+
+    @staticmethod
+    def discard(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def put(self, key, **arrays):
+        """Сохраняет запись атомарно (через временный файл) и освобождает место при необходимости."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """Записи кэша: (время последнего использования, размер, путь)."""
+        result = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                result.append((stat.st_mtime, stat.st_size, entry.path))
+        return result
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока кэш больше max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.unlink(path)
+
+    def stats(self):
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
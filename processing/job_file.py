@@ -0,0 +1,198 @@
+"""
+Двоичный файл задания (.lzjob).
+
+Заголовок фиксированного размера и следом массив записей по одной на отрезок:
+
+    magic    8 байт  b"LZRJOB\\r\\n" (перевод строки ловит порчу при текстовой передаче)
+    version  uint16
+    flags    uint16
+    header   uint32  размер заголовка = смещение первой записи
+    count    uint64  число записей
+    width    uint32  размер изображения задания
+    height   uint32
+    speed    float64 скорость по умолчанию, шагов/с
+    crc      uint32  CRC-32 всех записей
+    hcrc     uint32  CRC-32 заголовка до этого поля
+
+Запись (RECORD_DTYPE, little-endian, 24 байта): x0, y0, x1, y1 (int32),
+speed (float32, 0 — скорость по умолчанию), power (uint16, S), flags (uint16).
+Записи читаются через mmap без разбора, а по потоку — порциями подряд.
+"""
+import os
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+import config
+
+JOB_MAGIC = b"LZRJOB\r\n"
+JOB_VERSION = 1
+JOB_EXTENSION = ".lzjob"
+
+_HEADER = struct.Struct("<8sHHIQIIdI")
+_HEADER_CRC = struct.Struct("<I")
+HEADER_SIZE = 64  # Записи выровнены по 64 байтам
+
+RECORD_DTYPE = np.dtype([
+    ("x0", "<i4"), ("y0", "<i4"), ("x1", "<i4"), ("y1", "<i4"),
+    ("speed", "<f4"),
+    ("power", "<u2"),
+    ("flags", "<u2"),
+])
+
+CHUNK_RECORDS = 65536  # Записей в порции при записи и потоковом чтении
+
+
+def _pack_header(count, width, height, speed, crc):
+    header = _HEADER.pack(JOB_MAGIC, JOB_VERSION, 0, HEADER_SIZE, count, width, height, speed, crc)
+    header += _HEADER_CRC.pack(zlib.crc32(header))
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def _unpack_header(data):
+    """Разбирает и проверяет заголовок. Возвращает словарь полей или бросает ValueError."""
+    if len(data) < _HEADER.size + _HEADER_CRC.size:
+        raise ValueError("Файл задания обрезан: нет заголовка")
+    fields = _HEADER.unpack_from(data)
+    magic, version, flags, header_size, count, width, height, speed, crc = fields
+    if magic != JOB_MAGIC:
+        raise ValueError("Это не файл задания")
+    if version > JOB_VERSION:
+        raise ValueError(f"Версия файла задания {version} не поддерживается")
+    (header_crc,) = _HEADER_CRC.unpack_from(data, _HEADER.size)
+    if header_crc != zlib.crc32(data[:_HEADER.size]):
+        raise ValueError("Заголовок файла задания повреждён")
+    return {
+        "version": version, "flags": flags, "header_size": header_size, "count": count,
+        "width": width, "height": height, "speed": speed, "crc": crc,
+    }
+
+
+def make_records(segments, powers=None, speeds=None, power=config.MAX_POWER):
+    """Собирает массив записей из отрезков (N, 4) и необязательных мощностей и скоростей."""
+    segments = np.asarray(segments).reshape(-1, 4)
+    records = np.zeros(len(segments), dtype=RECORD_DTYPE)
+    structured_to_unstructured(records[["x0", "y0", "x1", "y1"]], copy=False)[...] = segments
+    records["power"] = power if powers is None else powers
+    if speeds is not None:
+        records["speed"] = speeds
+    return records
+
+
+def write_job(path, segments, width=0, height=0, powers=None, speeds=None, speed=0.0):
+    """
+    Записывает задание атомарно (через временный файл). Записи собираются
+    порциями, поэтому дополнительная память не зависит от размера задания.
+    Возвращает число записей.
+    """
+    segments = np.asarray(segments).reshape(-1, 4)
+    count = len(segments)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(bytes(HEADER_SIZE))
+            crc = 0
+            for start in range(0, count, CHUNK_RECORDS):
+                stop = start + CHUNK_RECORDS
+                records = make_records(
+                    segments[start:stop],
+                    None if powers is None else powers[start:stop],
+                    None if speeds is None else speeds[start:stop],
+                )
+                crc = zlib.crc32(records, crc)
+                f.write(records.tobytes())
+            f.seek(0)
+            f.write(_pack_header(count, width, height, speed, crc))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+
+class JobFile:
+    """
+    Задание, открытое через mmap: segments, powers и speeds — представления
+    над страницами файла без копирования, поэтому открытие не зависит от размера
+    задания, а несколько процессов делят одни и те же страницы в кэше ОС.
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, "rb") as f:
+            header = _unpack_header(f.read(HEADER_SIZE))
+        self.width = header["width"]
+        self.height = header["height"]
+        self.speed = header["speed"]
+        self.crc = header["crc"]
+
+        count = header["count"]
+        expected = header["header_size"] + count * RECORD_DTYPE.itemsize
+        if os.path.getsize(path) < expected:
+            raise ValueError("Файл задания обрезан")
+
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=header["header_size"], shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.segments = structured_to_unstructured(self.records[["x0", "y0", "x1", "y1"]], copy=False)
+        self.powers = self.records["power"]
+        self.speeds = self.records["speed"]
+
+        if verify and not self.verify():
+            raise ValueError("Контрольная сумма файла задания не совпадает")
+
+    def __len__(self):
+        return len(self.records)
+
+    def verify(self):
+        """Сверяет CRC-32 записей с заголовком (читает весь файл)."""
+        crc = 0
+        for start in range(0, len(self.records), CHUNK_RECORDS):
+            crc = zlib.crc32(self.records[start:start + CHUNK_RECORDS], crc)
+        return crc == self.crc
+
+    def chunks(self, size=CHUNK_RECORDS):
+        """Порции (segments, powers, speeds) по size записей — представления, без копий."""
+        for start in range(0, len(self.records), size):
+            stop = start + size
+            yield self.segments[start:stop], self.powers[start:stop], self.speeds[start:stop]
+
+
+def read_job_stream(stream, size=CHUNK_RECORDS):
+    """
+    Читает задание из потока (файл, канал, сокет) последовательно, не держа
+    его целиком в памяти. Возвращает (заголовок, генератор порций
+    (segments, powers, speeds)). Контрольная сумма проверяется по мере
+    чтения; при несовпадении в конце генератор бросает ValueError.
+    """
+    data = stream.read(HEADER_SIZE)
+    header = _unpack_header(data)
+    stream.read(header["header_size"] - len(data))
+    return header, _stream_chunks(stream, header, size)
+
+
+def _stream_chunks(stream, header, size):
+    remaining = header["count"]
+    crc = 0
+    while remaining:
+        want = min(size, remaining) * RECORD_DTYPE.itemsize
+        buffer = bytearray()
+        while len(buffer) < want:
+            block = stream.read(want - len(buffer))
+            if not block:
+                raise ValueError("Поток задания оборвался")
+            buffer += block
+        crc = zlib.crc32(buffer, crc)
+        records = np.frombuffer(buffer, dtype=RECORD_DTYPE)
+        remaining -= len(records)
+        yield (structured_to_unstructured(records[["x0", "y0", "x1", "y1"]], copy=False),
+               records["power"], records["speed"])
+
+    if crc != header["crc"]:
+        raise ValueError("Контрольная сумма задания не совпадает")
@@ -0,0 +1,163 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from processing.extraction import DEFAULT_THRESHOLD, mask_to_points
+
+BLOCK_ROWS = 256  # Строк в одном блоке, отдаваемом процессу
+
+_pool = None
+
+
+def get_pool(workers=None):
+    """
+    Общий пул процессов: создаётся один раз, чтобы не платить за запуск
+    процессов при каждой обработке. Используется spawn, потому что пул
+    запускается из рабочего потока GUI, а fork в многопоточном процессе небезопасен.
+    """
+    global _pool
+    if _pool is None:
+        context = multiprocessing.get_context("spawn")
+        _pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context)
+    return _pool
+
+
+def _attach(name, shape, dtype):
+    """
+    Подключается к блоку родителя, не регистрируя его в resource_tracker:
+    блоком владеет и удаляет его родитель. До Python 3.13 (track=False)
+    подключение регистрирует блок всегда, а снять регистрацию после нельзя —
+    обработчики spawn делят трекер с родителем, и это сняло бы его собственную.
+    """
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None  # Обработчик однопоточный
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _packed_shape(shape):
+    return shape[0], (shape[1] + 7) // 8
+
+
+def _count_block(name, shape, threshold, top, bottom, mask_name=None):
+    """Считает тёмные пиксели блока; если задан mask_name, пишет туда маску блока по битам."""
+    shm, gray = _attach(name, shape, np.uint8)
+    try:
+        mask = gray[top:bottom] <= threshold
+        if mask_name is not None:
+            mask_shm, packed = _attach(mask_name, _packed_shape(shape), np.uint8)
+            try:
+                packed[top:bottom] = np.packbits(mask, axis=1)  # Как processing.job_cache.pack_mask
+            finally:
+                del packed
+                mask_shm.close()
+        return int(np.count_nonzero(mask))
+    finally:
+        del gray
+        shm.close()
+
+
+def _write_block(name, shape, out_name, out_count, dtype, threshold, top, bottom, offset):
+    shm, gray = _attach(name, shape, np.uint8)
+    out_shm, out = _attach(out_name, (out_count, 2), dtype)
+    try:
+        points = mask_to_points(gray[top:bottom] <= threshold, dtype)
+        points[:, 1] += top
+        out[offset:offset + len(points)] = points
+        return len(points)
+    finally:
+        del gray, out
+        shm.close()
+        out_shm.close()
+
+
+def extract_points_parallel(gray, threshold=DEFAULT_THRESHOLD, block_rows=BLOCK_ROWS,
+                            progress=None, cancelled=None, workers=None, dtype=np.int32):
+    """
+    Извлекает тёмные пиксели (как extract_points) в нескольких процессах.
+
+    Изображение кладётся в разделяемую память и делится на блоки строк.
+    Первый проход считает точки в каждом блоке, второй пишет их сразу
+    в общий выходной массив типа dtype по своему смещению, поэтому результат
+    собирается без пересылки данных между процессами.
+
+    progress(done, total) вызывается после каждого блока второго прохода;
+    если cancelled() вернёт True, обработка прерывается и возвращается None.
+    """
+    result = _extract(gray, threshold, block_rows, progress, cancelled, workers, dtype, False)
+    return None if result is None else result[1]
+
+
+def extract_mask_parallel(gray, threshold=DEFAULT_THRESHOLD, block_rows=BLOCK_ROWS,
+                          progress=None, cancelled=None, workers=None, dtype=np.int32):
+    """
+    Как extract_points_parallel, но первый проход заодно пишет маску
+    прожига, упакованную по битам (как pack_mask), — отдельная бинаризация
+    всего изображения не нужна. Возвращает (packed, points) или None при отмене.
+    """
+    return _extract(gray, threshold, block_rows, progress, cancelled, workers, dtype, True)
+
+
+def _extract(gray, threshold, block_rows, progress, cancelled, workers, dtype, with_mask):
+    gray = np.ascontiguousarray(gray, dtype=np.uint8)
+    dtype = np.dtype(dtype)
+    height = gray.shape[0]
+    blocks = [(top, min(height, top + block_rows)) for top in range(0, height, block_rows)]
+    pool = get_pool(workers)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, gray.nbytes))
+    mask_shm = out_shm = None
+    futures = []
+    try:
+        np.ndarray(gray.shape, dtype=np.uint8, buffer=shm.buf)[:] = gray
+        if with_mask:
+            rows, row_bytes = _packed_shape(gray.shape)
+            mask_shm = shared_memory.SharedMemory(create=True, size=max(1, rows * row_bytes))
+        mask_name = mask_shm.name if mask_shm is not None else None
+
+        counts = list(pool.map(_count_block, *zip(*[
+            (shm.name, gray.shape, threshold, top, bottom, mask_name) for top, bottom in blocks
+        ])))
+        if cancelled and cancelled():
+            return None
+
+        total = sum(counts)
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).tolist()
+        out_shm = shared_memory.SharedMemory(create=True, size=max(1, total * 2 * dtype.itemsize))
+
+        futures = [
+            pool.submit(_write_block, shm.name, gray.shape, out_shm.name, total, dtype,
+                        threshold, top, bottom, offset)
+            for (top, bottom), offset in zip(blocks, offsets)
+        ]
+        for done, _ in enumerate(as_completed(futures), start=1):
+            if cancelled and cancelled():
+                return None
+            if progress:
+                progress(done, len(blocks))
+
+        points = np.ndarray((total, 2), dtype=dtype, buffer=out_shm.buf).copy()
+        packed = None
+        if mask_shm is not None:
+            packed = np.ndarray(_packed_shape(gray.shape), dtype=np.uint8, buffer=mask_shm.buf).copy()
+        return packed, points
+    finally:
+        # Блоки из очереди снимаем, а выполняющиеся дожидаемся: они подключены
+        # к разделяемой памяти, и удалять её раньше нельзя
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        for block in (shm, mask_shm, out_shm):
+            if block is not None:
+                block.close()
+                block.unlink()
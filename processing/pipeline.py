@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+import config
+
+from processing.extraction import to_gray, dark_mask, DEFAULT_THRESHOLD, MODE_LUMA
+from processing.toolpath import (
+    raster_runs, level_runs, runs_to_segments, travel_distance, JOB_RASTER, JOB_CONTOUR, JOB_TYPES
+)
+from processing.tiled import open_source, TiledProcessor
+from processing.dither import dither_mask, power_levels, DITHER_NONE, DITHER_POWER, POWER_LEVELS
+from processing.contours import extract_contours, order_polylines, polylines_to_segments
+
+def read_image(path, mode=MODE_LUMA):
+    """
+    Читает файл без Qt: для MODE_LUMA сразу в оттенках серого,
+    иначе — в цвете (BGR). Бросает ValueError, если файл не читается.
+    """
+    flags = cv2.IMREAD_GRAYSCALE if mode == MODE_LUMA else cv2.IMREAD_COLOR
+    image = cv2.imread(str(path), flags)
+    if image is None:
+        raise ValueError(f"Не удалось загрузить изображение: {path}")
+    return image
+
+
+def binarize(image, threshold=DEFAULT_THRESHOLD, mode=MODE_LUMA):
+    """Бинарное изображение uint8: 0 — прожигаемый пиксель, 255 — фон."""
+    return np.where(dark_mask(image, threshold, mode), 0, 255).astype(np.uint8)
+
+
+def build_segments(binary_image, job_type=JOB_RASTER, bidirectional=True, epsilon=1.0):
+    """
+    Строит траекторию задания в виде отрезков прожига (x0, y0, x1, y1):
+    JOB_RASTER — по одному отрезку на каждую серию чёрных пикселей в строке;
+    JOB_CONTOUR — упрощённые контуры в порядке, сокращающем холостые переезды.
+    """
+    if job_type == JOB_CONTOUR:
+        return polylines_to_segments(order_polylines(extract_contours(binary_image, epsilon)))
+    if job_type == JOB_RASTER:
+        return runs_to_segments(raster_runs(binary_image == 0, bidirectional))
+    raise ValueError(f"Неизвестный тип задания: {job_type}")
+
+
+def burn_mask(gray, threshold=DEFAULT_THRESHOLD, dither=DITHER_NONE):
+    """Маска прожигаемых пикселей: порог или один из способов дизеринга."""
+    if dither == DITHER_NONE:
+        return gray <= threshold
+    return dither_mask(gray, dither)
+
+
+def build_power_segments(gray, bidirectional=True, levels=POWER_LEVELS):
+    """
+    Растровая траектория с модуляцией мощности: отрезки постоянной ступени
+    яркости и мощность S для каждого отрезка.
+    """
+    runs, run_levels = level_runs(power_levels(gray, levels), bidirectional)
+    powers = np.rint(run_levels.astype(np.float32) * (config.MAX_POWER / levels)).astype(np.uint16)
+    return runs_to_segments(runs), powers
+
+
+def burn_length(segments):
+    """Суммарная длина отрезков прожига."""
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    return float(np.hypot(segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1]).sum())
+
+
+def process_file(path, threshold=DEFAULT_THRESHOLD, mode=MODE_LUMA, job_type=JOB_RASTER,
+                 dither=DITHER_NONE):
+    """
+    Полная обработка файла без GUI. Возвращает словарь с траекторией
+    и сводкой по заданию; powers — мощность каждого отрезка в режиме
+    DITHER_POWER, иначе None.
+
+    Растровые задания с порогом в режиме MODE_LUMA обрабатываются полосами
+    (TiledProcessor), поэтому память не зависит от размера изображения.
+    """
+    powers = None
+    if job_type == JOB_RASTER and mode == MODE_LUMA and dither == DITHER_NONE:
+        tiled = TiledProcessor(open_source(path), threshold)
+        segments = runs_to_segments(np.concatenate([runs for _, _, _, runs in tiled.bands()]))
+        points = tiled.points_count
+        height, width = tiled.shape
+    else:
+        gray = to_gray(read_image(path, mode), mode)
+        mask = burn_mask(gray, threshold, dither)
+        binary_image = np.where(mask, 0, 255).astype(np.uint8)
+        if dither == DITHER_POWER and job_type == JOB_RASTER:
+            segments, powers = build_power_segments(gray)
+        else:
+            segments = build_segments(binary_image, job_type)
+        points = int(np.count_nonzero(mask))
+        height, width = binary_image.shape
+
+    return {
+        "segments": segments,
+        "powers": powers,
+        "width": width,
+        "height": height,
+        "points": points,
+        "burn_length": burn_length(segments),
+        "travel_length": travel_distance(segments),
+    }
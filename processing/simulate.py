@@ -0,0 +1,180 @@
+import time
+
+import numpy as np
+
+import config
+from processing.estimate import plan_moves
+
+# Журнал времени: по строке на отрезок, секунды от начала задания
+TIMING_DTYPE = np.dtype([
+    ("start", np.float64),       # Начало переезда к отрезку (или прожига, если переезда нет)
+    ("burn_start", np.float64),  # Включение лазера
+    ("end", np.float64),         # Конец прожига отрезка
+])
+
+RASTER_CHUNK = 1 << 20  # Пикселей за один проход растеризации
+
+
+def segment_pixels(segments):
+    """
+    Пиксели всех отрезков без цикла. Концы отрезков — границы пикселей
+    (как у runs_to_segments), поэтому на отрезок приходится max(|dx|, |dy|)
+    пикселей, взятых по серединам шагов; точечный отрезок — один пиксель.
+    Возвращает (xs, ys, owner) — координаты и номер отрезка для каждого пикселя.
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    dx = segments[:, 2] - segments[:, 0]
+    dy = segments[:, 3] - segments[:, 1]
+    counts = segment_pixel_counts(segments)
+
+    owner = np.repeat(np.arange(len(segments)), counts)
+    first = np.cumsum(counts) - counts
+    step = np.arange(len(owner)) - first[owner]
+    fraction = (step + 0.5) / counts[owner]
+    xs = segments[owner, 0] + np.floor(dx[owner] * fraction).astype(np.int64)
+    ys = segments[owner, 1] + np.floor(dy[owner] * fraction).astype(np.int64)
+    return xs, ys, owner
+
+
+def segment_pixel_counts(segments):
+    """Число пикселей каждого отрезка: max(|dx|, |dy|), не меньше одного."""
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    return np.maximum(np.abs(segments[:, 2:] - segments[:, :2]).max(axis=1), 1)
+
+
+class JobSimulator:
+    """
+    Ускоренная симуляция всего задания без Qt и без тиков таймера.
+
+    Время каждого отрезка берётся из той же модели движения, что у оценки
+    времени (plan_moves), а все отрезки с включённым лазером растеризуются
+    пачками. Результат — карта плотности прожига (секунды воздействия
+    на пиксель с учётом мощности) и журнал времени по отрезкам.
+    """
+
+    def __init__(self, segments, shape, feed, powers=None,
+                 acceleration=config.MAX_ACCELERATION,
+                 junction_deviation=config.JUNCTION_DEVIATION, start=(0, 0)):
+        self.segments = np.asarray(segments, dtype=np.int32).reshape(-1, 4)
+        self.shape = tuple(shape)  # (высота, ширина) карты плотности
+        self.feed = feed
+        self.powers = powers
+        self.timing = self._build_timing(acceleration, junction_deviation, start)
+
+        # Воздействие на один пиксель каждого отрезка
+        pixels = segment_pixel_counts(self.segments)
+        self.pixel_ends = np.cumsum(pixels, dtype=np.int64)
+        dwell = np.maximum(self.burn_times(), 1.0 / feed)
+        if powers is not None:
+            dwell = dwell * (np.asarray(powers, dtype=np.float64) / config.MAX_POWER)
+        self.pixel_dwell = dwell / pixels
+
+    def _build_timing(self, acceleration, junction_deviation, start):
+        laser, _, times, segment = plan_moves(self.segments, self.feed, acceleration,
+                                              junction_deviation, start)
+        count = len(self.segments)
+        travel = np.bincount(segment[~laser], times[~laser], minlength=count)
+        burn = np.bincount(segment[laser], times[laser], minlength=count)
+
+        timing = np.empty(count, dtype=TIMING_DTYPE)
+        timing["end"] = np.cumsum(travel + burn)
+        timing["burn_start"] = timing["end"] - burn
+        timing["start"] = timing["burn_start"] - travel
+        return timing
+
+    @property
+    def total_time(self):
+        return float(self.timing["end"][-1]) if len(self.timing) else 0.0
+
+    def burn_times(self):
+        """Длительность прожига каждого отрезка, с."""
+        return self.timing["end"] - self.timing["burn_start"]
+
+    def accumulate(self, density, first, last):
+        """
+        Добавляет в density воздействие отрезков first..last-1.
+        Время прожига отрезка делится поровну между его пикселями; точечный отрезок
+        (движения нет) получает время прохода одной единицы на номинальной скорости.
+        """
+        height, width = density.shape
+        flat_density = density.reshape(-1)
+
+        # Порции по числу пикселей, а не отрезков: память не зависит от длины отрезков
+        while first < last:
+            base = self.pixel_ends[first - 1] if first else 0
+            stop = int(np.searchsorted(self.pixel_ends, base + RASTER_CHUNK, side="right"))
+            stop = min(max(stop, first + 1), last)
+
+            xs, ys, owner = segment_pixels(self.segments[first:stop])
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            flat = ys[inside] * width + xs[inside]
+            if flat.size:
+                # Отрезки идут по порядку, поэтому индексы порции лежат в узком диапазоне
+                low = flat.min()
+                weights = self.pixel_dwell[first:stop][owner[inside]]
+                counts = np.bincount(flat - low, weights)
+                flat_density[low:low + counts.size] += counts
+            first = stop
+        return density
+
+    def density(self, until=None):
+        """Карта плотности прожига (float64) для отрезков, законченных к моменту until (с)."""
+        last = len(self.segments) if until is None else int(
+            np.searchsorted(self.timing["end"], until, side="right"))
+        return self.accumulate(np.zeros(self.shape), 0, last)
+
+    def run(self, multiplier=None, interval=0.05, progress=None, cancelled=None):
+        """
+        Проигрывает задание в multiplier раз быстрее реального времени
+        (None — мгновенно). progress(done, total, sim_time) вызывается
+        каждые interval секунд; если cancelled() вернёт True, возвращается None.
+        """
+        total = len(self.segments)
+        if multiplier is None:
+            density = self.density()
+            if progress:
+                progress(total, total, self.total_time)
+            return density
+
+        density = np.zeros(self.shape)
+        done = 0
+        started = time.monotonic()
+        while done < total:
+            if cancelled and cancelled():
+                return None
+            time.sleep(interval)
+            sim_time = (time.monotonic() - started) * multiplier
+            reached = int(np.searchsorted(self.timing["end"], sim_time, side="right"))
+            self.accumulate(density, done, reached)
+            done = reached
+            if progress:
+                progress(done, total, min(sim_time, self.total_time))
+        return density
+
+    def save_timing(self, path):
+        """Журнал времени в CSV: номер отрезка, координаты, начало, включение лазера, конец."""
+        index = np.arange(len(self.segments))
+        table = np.column_stack([index, self.segments, self.timing["start"],
+                                 self.timing["burn_start"], self.timing["end"]])
+        np.savetxt(path, table, delimiter=",", fmt=["%d"] * 5 + ["%.6f"] * 3,
+                   header="segment,x0,y0,x1,y1,start,burn_start,end", comments="")
+
+
+def hotspots(density, factor=3.0):
+    """
+    Пиксели с перегревом: воздействие больше медианного по прожигаемым
+    пикселям в factor раз. Возвращает (N, 2) координаты (x, y).
+    """
+    burned = density[density > 0]
+    if burned.size == 0:
+        return np.empty((0, 2), dtype=np.int32)
+    ys, xs = np.nonzero(density > factor * np.median(burned))
+    return np.column_stack([xs, ys]).astype(np.int32)
+
+
+def density_image(density):
+    """Карта плотности в uint8 для просмотра: белый — нет воздействия, чёрный — максимум."""
+    peak = density.max()
+    if peak <= 0:
+        return np.full(density.shape, 255, dtype=np.uint8)
+    return (255 - np.rint(density * (255 / peak))).astype(np.uint8)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from processing.extraction import mask_to_points
+
+
+class ThresholdIndex:
+    """
+    Индекс яркостей для мгновенной смены порога.
+
+    Строится один раз на изображение: гистограмма и номера пикселей,
+    сгруппированные по яркости (корзина v — order[bounds[v]:bounds[v + 1]]).
+    При смене порога маска и бинарное изображение обновляются только
+    в корзинах между старым и новым порогом.
+    """
+
+    def __init__(self, gray, threshold):
+        gray = np.ascontiguousarray(gray, dtype=np.uint8)
+        self.shape = gray.shape
+        flat = gray.ravel()
+
+        self.histogram = np.bincount(flat, minlength=256)
+        self.bounds = np.concatenate(([0], np.cumsum(self.histogram)))
+        index_type = np.int32 if flat.size < 2 ** 31 else np.int64
+        # Сортировка uint8 устойчивая (поразрядная): внутри корзины — построчный порядок
+        self.order = np.argsort(flat, kind="stable").astype(index_type)
+
+        self.threshold = threshold
+        self.mask = (gray <= threshold)
+
+    def count(self, threshold=None):
+        """Сколько пикселей прожигается при пороге threshold (без обхода изображения)."""
+        t = self.threshold if threshold is None else threshold
+        return int(self.bounds[t + 1])
+
+    def changed(self, threshold):
+        """Номера пикселей, меняющих состояние при переходе к threshold, и новое состояние."""
+        old = self.threshold
+        if threshold > old:
+            return self.order[self.bounds[old + 1]:self.bounds[threshold + 1]], True
+        return self.order[self.bounds[threshold + 1]:self.bounds[old + 1]], False
+
+    def apply(self, threshold, preview=None):
+        """
+        Переходит к новому порогу. Маска (и, если передано, превью
+        processing.burn_mask.MaskPreview) обновляются на месте.
+        Возвращает число изменившихся пикселей.
+        """
+        threshold = int(max(0, min(255, threshold)))
+        if threshold == self.threshold:
+            return 0
+
+        indices, dark = self.changed(threshold)
+        self.mask.ravel()[indices] = dark
+        if preview is not None:
+            preview.update(indices, dark)
+        self.threshold = threshold
+        return len(indices)
+
+    def points(self):
+        """Точки (N, 2) при текущем пороге в построчном порядке."""
+        return mask_to_points(self.mask)
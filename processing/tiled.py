@@ -0,0 +1,178 @@
+import struct
+
+import cv2
+import numpy as np
+
+from processing.extraction import DEFAULT_THRESHOLD, mask_to_points
+from processing.toolpath import raster_runs
+
+BAND_HEIGHT = 256     # Строк в одной полосе
+PREVIEW_SIZE = 1024   # Наибольшая сторона уменьшенной копии для показа
+
+
+def _to_gray(band):
+    """Полоса BGR/BGRA или оттенки серого -> оттенки серого uint8 (как cv2.IMREAD_GRAYSCALE)."""
+    if band.ndim == 2:
+        return band
+    band = np.ascontiguousarray(band)
+    code = cv2.COLOR_BGRA2GRAY if band.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(band, code)
+
+
+class NpySource:
+    """Массив .npy (h×w или h×w×3 BGR), отображённый в память."""
+
+    def __init__(self, path):
+        self.array = np.load(path, mmap_mode="r")
+        self.shape = self.array.shape[:2]
+
+    def read_band(self, top, bottom):
+        return _to_gray(self.array[top:bottom])
+
+
+class BmpSource:
+    """
+    Несжатый BMP (8, 24 или 32 бита), отображённый в память через np.memmap.
+    Файл не читается целиком: каждая полоса берётся прямо из отображения.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(54)
+            if len(header) < 54 or header[:2] != b"BM":
+                raise ValueError(f"Не BMP-файл: {path}")
+            offset = struct.unpack_from("<I", header, 10)[0]
+            dib_size, width, height, _, bpp, compression = struct.unpack_from("<IiiHHI", header, 14)
+            colors_used = struct.unpack_from("<I", header, 46)[0]
+            if bpp not in (8, 24, 32) or compression not in (0, 3):
+                raise ValueError(f"Неподдерживаемый BMP: {bpp} бит, сжатие {compression}")
+
+            self.lut = None
+            if bpp == 8:
+                f.seek(14 + dib_size)
+                count = colors_used or 256
+                palette = np.frombuffer(f.read(count * 4), dtype=np.uint8).reshape(-1, 1, 4)
+                lut = np.zeros(256, dtype=np.uint8)
+                lut[:count] = cv2.cvtColor(np.ascontiguousarray(palette[:, :, :3]), cv2.COLOR_BGR2GRAY)[:, 0]
+                self.lut = lut
+
+        self.bottom_up = height > 0
+        self.width = width
+        self.height = abs(height)
+        self.channels = bpp // 8
+        stride = (width * bpp + 31) // 32 * 4
+        self.rows = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(self.height, stride))
+        self.shape = (self.height, self.width)
+
+    def read_band(self, top, bottom):
+        if self.bottom_up:
+            rows = self.rows[self.height - bottom:self.height - top][::-1]
+        else:
+            rows = self.rows[top:bottom]
+
+        pixels = rows[:, :self.width * self.channels]
+        if self.channels == 1:
+            return self.lut[pixels]
+        return _to_gray(pixels.reshape(len(rows), self.width, self.channels))
+
+
+class DecodedSource:
+    """Сжатые форматы (PNG, JPG): декодируются один раз сразу в оттенки серого."""
+
+    def __init__(self, path):
+        self.array = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if self.array is None:
+            raise ValueError(f"Не удалось загрузить изображение: {path}")
+        self.shape = self.array.shape
+
+    def read_band(self, top, bottom):
+        return self.array[top:bottom]
+
+
+def open_source(path):
+    """Открывает изображение для чтения полосами, без загрузки целиком, если формат позволяет."""
+    suffix = str(path).lower().rsplit(".", 1)[-1]
+    if suffix == "npy":
+        return NpySource(path)
+    if suffix == "bmp":
+        try:
+            return BmpSource(path)
+        except ValueError:
+            pass  # Сжатый или экзотический BMP читаем через OpenCV
+    return DecodedSource(path)
+
+
+class TiledProcessor:
+    """
+    Построчная (полосами) обработка большого изображения.
+
+    Порог, точки и растровые отрезки считаются для каждой полосы отдельно,
+    а в памяти целиком хранится только уменьшенная копия (preview_gray,
+    preview_binary) с целым коэффициентом уменьшения factor.
+    Генератор bands() отдаёт результат первой полосы до чтения последней.
+    """
+
+    def __init__(self, source, threshold=DEFAULT_THRESHOLD, band_height=BAND_HEIGHT,
+                 preview_size=PREVIEW_SIZE, bidirectional=True):
+        self.source = source
+        self.threshold = threshold
+        self.bidirectional = bidirectional
+
+        height, width = source.shape
+        self.factor = max(1, -(-max(height, width) // preview_size))
+        # Высота полосы кратна коэффициенту, чтобы полосы ложились на целые строки превью
+        self.band_height = max(self.factor, band_height // self.factor * self.factor)
+
+        preview_shape = (-(-height // self.factor), -(-width // self.factor))
+        self.preview_gray = np.full(preview_shape, 255, dtype=np.uint8)
+        self.preview_binary = np.full(preview_shape, 255, dtype=np.uint8)
+        self.points_count = 0
+
+    @property
+    def shape(self):
+        return self.source.shape
+
+    def band_count(self):
+        return -(-self.shape[0] // self.band_height)
+
+    def _downsample(self, band):
+        """Среднее по блокам factor×factor (эквивалент INTER_AREA при целом коэффициенте)."""
+        f = self.factor
+        if f == 1:
+            return band
+        rows, cols = band.shape
+        padded = np.pad(band, ((0, -rows % f), (0, -cols % f)), mode="edge")
+        blocks = padded.reshape(padded.shape[0] // f, f, padded.shape[1] // f, f)
+        return blocks.mean(axis=(1, 3)).astype(np.uint8)
+
+    def bands(self):
+        """
+        Генератор по полосам: (top, bottom, points, runs), где points — (N, 2)
+        координаты тёмных пикселей полосы, runs — отрезки (y, x_start, x_end)
+        в координатах всего изображения.
+        """
+        height = self.shape[0]
+        reversed_next = False
+        for top in range(0, height, self.band_height):
+            bottom = min(height, top + self.band_height)
+            gray = self.source.read_band(top, bottom)
+            mask = gray <= self.threshold
+
+            points = mask_to_points(mask)
+            points[:, 1] += top
+            self.points_count += len(points)
+
+            runs = raster_runs(mask, self.bidirectional, reversed_next)
+            runs[:, 0] += top
+            if self.bidirectional:
+                non_empty = int(np.count_nonzero(mask.any(axis=1)))
+                reversed_next ^= bool(non_empty % 2)
+
+            preview_top = top // self.factor
+            small = self._downsample(gray)
+            self.preview_gray[preview_top:preview_top + len(small)] = small
+            self.preview_binary[preview_top:preview_top + len(small)] = np.where(
+                self._downsample(np.where(mask, 0, 255).astype(np.uint8)) < 128, 0, 255
+            )
+
+            yield top, bottom, points, runs
@@ -0,0 +1,124 @@
+import numpy as np
+
+# Типы задания (определены здесь, а не в pipeline, чтобы интерфейс
+# мог взять их без загрузки OpenCV)
+JOB_RASTER = "raster"    # Построчный прожиг заливки
+JOB_CONTOUR = "contour"  # Резка по контурам
+JOB_TYPES = (JOB_RASTER, JOB_CONTOUR)
+
+
+def raster_runs(mask, bidirectional=True, start_reversed=False):
+    """
+    Разбивает бинарную маску на горизонтальные отрезки прожига.
+
+    Возвращает массив (M, 3) int32 со строками (y, x_start, x_end), где x_start
+    и x_end — границы пикселей: отрезок прожигает пиксели между ними, и
+    |x_end - x_start| равно числу пикселей (одиночный пиксель x — отрезок x..x+1).
+    Пустые строки пропускаются. В режиме bidirectional каждая вторая непустая строка
+    проходится справа налево: порядок отрезков в ней обратный, а x_start > x_end.
+    start_reversed — первая непустая строка идёт справа налево (нужно, когда
+    маска — очередная полоса большого изображения).
+    """
+    mask = np.asarray(mask, dtype=bool)
+    height, width = mask.shape
+
+    # Границы отрезков: +1 — начало, -1 — конец (граница после последнего пикселя)
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+
+    start_y, start_x = np.nonzero(edges == 1)
+    _, end_x = np.nonzero(edges == -1)
+
+    runs = np.empty((len(start_x), 3), dtype=np.int32)
+    runs[:, 0] = start_y
+    runs[:, 1] = start_x
+    runs[:, 2] = end_x
+
+    if bidirectional and len(runs):
+        runs = runs[_serpentine(runs, start_reversed)]
+
+    return runs
+
+
+def serpentine_runs(runs):
+    """
+    Отрезки raster_runs(..., bidirectional=False) в порядке «змейкой» —
+    то же, что дал бы raster_runs(..., bidirectional=True). Возвращает копию.
+    """
+    runs = np.array(runs)
+    if len(runs):
+        runs = runs[_serpentine(runs)]
+    return runs
+
+
+def _serpentine(runs, start_reversed=False):
+    """
+    Переупорядочивает отрезки «змейкой»: в каждой второй непустой строке
+    они идут справа налево, а их концы меняются местами (на месте).
+    Возвращает перестановку, которую нужно применить к runs и сопутствующим массивам.
+    """
+    # Номер строки среди непустых: нечётные идут в обратную сторону
+    _, row_rank = np.unique(runs[:, 0], return_inverse=True)
+    reverse = (row_rank % 2) == (0 if start_reversed else 1)
+    runs[reverse, 1], runs[reverse, 2] = runs[reverse, 2], runs[reverse, 1].copy()
+    return np.lexsort((np.where(reverse, -runs[:, 1], runs[:, 1]), runs[:, 0]))
+
+
+def level_runs(levels, bidirectional=True):
+    """
+    Как raster_runs, но для изображения ступеней мощности (0 — не прожигать):
+    отрезок прерывается при смене ступени. Возвращает (runs, run_levels),
+    где runs — (M, 3) (y, x_start, x_end) с концами на границах пикселей,
+    run_levels — ступень каждого отрезка.
+    """
+    levels = np.asarray(levels)
+    height, width = levels.shape
+
+    padded = np.zeros((height, width + 2), dtype=np.int16)
+    padded[:, 1:-1] = levels
+    changes = np.diff(padded, axis=1) != 0
+
+    # Границы участков постоянной ступени: начало в x, конец перед следующей границей
+    ys, xs = np.nonzero(changes)
+    next_x = np.roll(xs, -1)
+    same_row = np.roll(ys, -1) == ys
+    values = padded[ys, xs + 1]
+    keep = same_row & (values > 0) & (xs < width)
+
+    runs = np.empty((int(keep.sum()), 3), dtype=np.int32)
+    runs[:, 0] = ys[keep]
+    runs[:, 1] = xs[keep]
+    runs[:, 2] = next_x[keep]
+    run_levels = values[keep].astype(np.uint8)
+
+    if bidirectional and len(runs):
+        order = _serpentine(runs)
+        runs = runs[order]
+        run_levels = run_levels[order]
+
+    return runs, run_levels
+
+
+def runs_to_segments(runs):
+    """
+    Переводит отрезки (y, x_start, x_end) в отрезки движения (x0, y0, x1, y1).
+    Концы уже на границах пикселей, поэтому длина отрезка равна числу пикселей.
+    """
+    runs = np.asarray(runs, dtype=np.int32).reshape(-1, 3)
+    segments = np.empty((len(runs), 4), dtype=np.int32)
+    segments[:, 0] = runs[:, 1]
+    segments[:, 1] = runs[:, 0]
+    segments[:, 2] = runs[:, 2]
+    segments[:, 3] = runs[:, 0]
+    return segments
+
+
+def travel_distance(segments, start=(0, 0)):
+    """Суммарная длина холостых перемещений (лазер выключен) между отрезками."""
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if not len(segments):
+        return 0.0
+
+    ends = np.vstack(([start], segments[:-1, 2:4]))
+    return float(np.hypot(*(segments[:, 0:2] - ends).T).sum())
@@ -0,0 +1,69 @@
+"""
+Выполнение очереди заданий на нескольких станках.
+
+    python -m scheduler out/*.lzjob --port /dev/ttyUSB0 --port /dev/ttyUSB1
+    python -m scheduler out/*.lzjob --emulate 3
+
+Задания — файлы .lzjob (python -m batch ... --format job). Свободный станок
+берёт самое длинное по оценке задание; в конце печатается загрузка станков.
+"""
+import argparse
+import asyncio
+import glob
+import sys
+
+from controllers.job_scheduler import JobScheduler, ScheduledJob, Machine, start_emulated_machines
+
+
+def load_jobs(patterns):
+    jobs = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            jobs.append(ScheduledJob.from_file(path))
+    return jobs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Очередь заданий для нескольких лазерных станков")
+    parser.add_argument("jobs", nargs="+", help="файлы заданий .lzjob или glob-шаблоны")
+    parser.add_argument("--port", action="append", default=[], help="порт контроллера станка (можно несколько)")
+    parser.add_argument("--emulate", type=int, default=0, help="число эмулируемых станков GRBL")
+    parser.add_argument("--block-time", type=float, default=0.001,
+                        help="время исполнения одного движения в эмуляторе, с")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = load_jobs(args.jobs)
+    if not jobs:
+        print("⚠️ Не найдено заданий.")
+        return 1
+
+    emulators = []
+    machines = [Machine(f"laser-{index + 1}", port) for index, port in enumerate(args.port)]
+    if args.emulate:
+        emulated, emulators = start_emulated_machines(args.emulate, block_time=args.block_time)
+        machines += emulated
+    if not machines:
+        print("⚠️ Укажите --port или --emulate.")
+        return 1
+
+    scheduler = JobScheduler(machines)
+    for job in jobs:
+        scheduler.submit(job)
+    try:
+        report = asyncio.run(scheduler.run())
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    print(f"✅ Выполнено заданий: {len(jobs)} за {scheduler.elapsed():.1f} с")
+    for name, row in report.items():
+        print(f"{name:>10}  заданий: {row['jobs']:3d}  работа: {row['busy_time']:7.1f} с  "
+              f"загрузка: {row['utilisation']:.0%}")
+    return 1 if any(row["errors"] for row in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import numpy as np
+
+from processing.burn_mask import MaskPreview, mask_preview
+from processing.threshold_index import ThresholdIndex
+
+
+def test_mask_preview_matches_area_resize():
+    mask = np.random.default_rng(4).random((600, 900)) < 0.3
+
+    preview = MaskPreview(mask, 300)
+    expected = mask_preview(lambda top, bottom: mask[top:bottom], mask.shape, 300)
+
+    assert preview.image.shape == expected.shape == (300, 450)
+    assert np.abs(preview.image.astype(int) - expected).max() <= 1
+
+
+def test_threshold_change_updates_preview_in_place():
+    gray = np.random.default_rng(5).integers(0, 256, (500, 700), dtype=np.uint8)
+    index = ThresholdIndex(gray, 128)
+    preview = MaskPreview(index.mask, 300)
+
+    for threshold in (40, 200, 90, 90, 255, 0):
+        index.apply(threshold, preview)
+        assert np.array_equal(preview.image, MaskPreview(gray <= threshold, 300).image)
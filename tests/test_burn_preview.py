@@ -0,0 +1,17 @@
+import numpy as np
+
+from ui.burn_preview import BurnPreview
+
+
+def test_restart_clears_previous_burn():
+    simulation = np.full((10, 10), 255, dtype=np.uint8)
+    points = np.array([[x, y] for y in range(10) for x in range(10)], dtype=np.uint16)
+    preview = BurnPreview(simulation, points, (10, 10), duration_ms=0)
+    preview.advance()
+    assert (simulation == 0).all()
+
+    preview.points = points[:5]
+    preview.start()
+    assert (simulation == 255).all()
+    preview.advance()
+    assert np.count_nonzero(simulation == 0) == 5
@@ -0,0 +1,42 @@
+import numpy as np
+
+from processing.contours import order_polylines, polylines_to_segments
+from processing.toolpath import travel_distance
+
+
+def random_polylines(count=40, seed=8):
+    rng = np.random.default_rng(seed)
+    polylines = []
+    for _ in range(count):
+        centre = rng.integers(20, 480, 2)
+        sides = int(rng.integers(3, 7))
+        angles = np.sort(rng.random(sides)) * 2 * np.pi
+        polylines.append((centre + 10 * np.column_stack([np.cos(angles), np.sin(angles)])).astype(np.int32))
+    return polylines
+
+
+def is_rotation(polyline, original):
+    if len(polyline) != len(original):
+        return False
+    return any(np.array_equal(np.roll(original, -shift, axis=0), polyline) for shift in range(len(original)))
+
+
+def test_order_is_a_permutation_of_rotated_contours():
+    polylines = random_polylines()
+
+    ordered = order_polylines(polylines)
+
+    assert len(ordered) == len(polylines)
+    unused = list(range(len(polylines)))
+    for polyline in ordered:
+        match = next(i for i in unused if is_rotation(polyline, polylines[i]))
+        unused.remove(match)
+    assert unused == []
+
+
+def test_order_does_not_increase_travel():
+    for seed in range(5):
+        polylines = random_polylines(seed=seed)
+        before = travel_distance(polylines_to_segments(polylines))
+        after = travel_distance(polylines_to_segments(order_polylines(polylines)))
+        assert after <= before
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from processing.dither import (
+    DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS, DITHER_POWER,
+    FLOYD_STEINBERG, JARVIS, bayer_matrix, dither_mask, error_diffusion, power_levels,
+)
+
+
+def serial_diffusion(gray, kernel):
+    """Обычный попиксельный проход для сравнения с волновым."""
+    taps, divisor, _ = kernel
+    height, width = gray.shape
+    buffer = gray.astype(np.float32)
+    dark = np.zeros(gray.shape, dtype=bool)
+    for y in range(height):
+        for x in range(width):
+            old = buffer[y, x]
+            dark[y, x] = old < 128
+            error = old - (0 if dark[y, x] else 255)
+            for dy, dx, weight in taps:
+                if 0 <= y + dy < height and 0 <= x + dx < width:
+                    buffer[y + dy, x + dx] += np.float32(error * (weight / divisor))
+    return dark
+
+
+def test_bayer_matrix_is_a_permutation():
+    assert sorted(bayer_matrix(3).ravel().tolist()) == list(range(64))
+
+
+@pytest.mark.parametrize("kernel", [FLOYD_STEINBERG, JARVIS])
+def test_error_diffusion_matches_serial_pass(kernel):
+    gray = np.random.default_rng(5).integers(0, 256, size=(23, 31)).astype(np.uint8)
+    assert np.array_equal(error_diffusion(gray, kernel), serial_diffusion(gray, kernel))
+
+
+@pytest.mark.parametrize("mode", [DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS, DITHER_POWER])
+def test_black_burns_and_white_does_not(mode):
+    assert dither_mask(np.zeros((16, 16), dtype=np.uint8), mode).all()
+    assert not dither_mask(np.full((16, 16), 255, dtype=np.uint8), mode).any()
+
+
+@pytest.mark.parametrize("mode", [DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS])
+def test_mid_gray_burns_about_half(mode):
+    burned = dither_mask(np.full((64, 64), 128, dtype=np.uint8), mode).mean()
+    assert 0.4 < burned < 0.6
+
+
+def test_power_levels_grow_with_darkness():
+    levels = power_levels(np.arange(256, dtype=np.uint8))
+    assert levels[0] == 16 and levels[-1] == 0
+    assert (np.diff(levels.astype(int)) <= 0).all()
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        dither_mask(np.zeros((2, 2), dtype=np.uint8), "halftone")
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from controllers.motion_planner import MotionPlanner
+from processing.estimate import estimate_job, job_moves
+from processing.toolpath import raster_runs, runs_to_segments
+
+
+def test_estimate_matches_motion_planner():
+    mask = np.random.default_rng(9).random((12, 40)) < 0.5
+    segments = runs_to_segments(raster_runs(mask))
+    feed, acceleration, junction_deviation = 50.0, 2000.0, 0.05
+
+    targets, laser, _ = job_moves(segments)
+    planner = MotionPlanner(acceleration, junction_deviation, lookahead=len(targets))
+    planner.start([(x, y, on) for (x, y), on in zip(targets.tolist(), laser.tolist())], (0, 0), feed)
+    planner.thread.join()
+    planned, done = planner.horizon()
+
+    estimate = estimate_job(segments, feed, acceleration, junction_deviation)
+    assert done
+    assert estimate["total_time"] == pytest.approx(planned, rel=1e-3)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from controllers.gcode import feed_rate, segments_to_gcode
+from controllers.gcode_sender import GcodeSender, clean_line
+from controllers.grbl_emulator import GrblEmulator
+from processing.toolpath import raster_runs, runs_to_segments
+
+
+def job_lines():
+    mask = np.random.default_rng(6).random((30, 40)) < 0.4
+    return list(segments_to_gcode(runs_to_segments(raster_runs(mask)), speed=100))
+
+
+def test_stream_through_emulator():
+    lines = job_lines()
+    with GrblEmulator(block_time=0.0001) as emulator, GcodeSender(emulator.port, timeout=5) as sender:
+        result = sender.stream(lines)
+        stats = emulator.stats()
+
+    expected = [clean_line(line) for line in lines if clean_line(line)]
+    assert result["lines"] == len(expected)
+    assert result["errors"] == []
+    assert stats["lines"] == len(expected)
+    assert stats["overflows"] == 0
+    assert stats["max_rx_used"] <= 128
+
+
+def test_line_longer_than_buffer_is_rejected():
+    with GrblEmulator() as emulator, GcodeSender(emulator.port, timeout=5) as sender:
+        with pytest.raises(ValueError):
+            sender.stream(["G1 X" + "1" * 200])
+
+
+def test_gui_and_gcode_use_the_same_speed_unit():
+    from controllers.motor_controller import MotorController
+
+    motor = MotorController(laser_view=None)
+    motor.set_speed(25)
+    assert motor.feed_rate() * 60 == feed_rate(25)
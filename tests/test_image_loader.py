@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+import pytest
+
+from processing.dither import DITHER_BAYER
+from processing.pipeline import JOB_RASTER, JOB_CONTOUR, burn_mask
+from processing.toolpath import raster_runs, runs_to_segments
+from ui.image_loader import ImageLoader
+
+
+def make_loader(tmp_path, shape=(40, 50)):
+    path = str(tmp_path / "image.png")
+    cv2.imwrite(path, np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8))
+    loader = ImageLoader()
+    loader.job_cache = None
+    loader.load_file(path)
+    loader.process_image()
+    return loader
+
+
+def test_rebuilt_mask_drops_threshold_index(tmp_path):
+    loader = make_loader(tmp_path)
+    loader.set_threshold(100)
+    assert loader.threshold_index is not None
+
+    loader.process_image()
+
+    assert loader.threshold_index is None
+    loader.set_threshold(60)
+    assert loader.threshold_index.threshold == 60
+    assert np.array_equal(loader.threshold_index.mask, burn_mask(loader.gray_image, 60, loader.dither))
+
+
+def test_tiled_threshold_change_needs_background_processing(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.TILED_MIN_PIXELS", 100)
+    loader = make_loader(tmp_path)
+    assert loader.tiled is not None
+    assert not loader.needs_processing(JOB_RASTER)
+
+    loader.set_threshold(60)
+    loader.commit_threshold()
+
+    assert loader.needs_processing(JOB_RASTER)
+    assert not loader.needs_processing(JOB_CONTOUR)
+
+
+def test_tiled_raster_honours_bidirectional(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.TILED_MIN_PIXELS", 100)
+    loader = make_loader(tmp_path, shape=(600, 50))
+    mask = cv2.imread(loader.file_path, cv2.IMREAD_GRAYSCALE) <= loader.threshold
+
+    for bidirectional in (True, False):
+        segments = loader.build_toolpath(JOB_RASTER, bidirectional)
+        assert np.array_equal(segments, runs_to_segments(raster_runs(mask, bidirectional)))
+
+
+def test_tiled_rejects_dithering(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.TILED_MIN_PIXELS", 100)
+    loader = make_loader(tmp_path)
+    loader.dither = DITHER_BAYER
+
+    with pytest.raises(ValueError):
+        loader.process_image()
+
+
+def test_cache_key_follows_parameters_that_change_the_job(tmp_path):
+    loader = make_loader(tmp_path)
+    loader.file_digest = "digest"
+
+    assert loader.cache_key(JOB_CONTOUR, epsilon=1.0) != loader.cache_key(JOB_CONTOUR, epsilon=2.0)
+    assert loader.cache_key(JOB_CONTOUR, bidirectional=True) == loader.cache_key(JOB_CONTOUR, bidirectional=False)
+
+    loader.dither = DITHER_BAYER
+    key = loader.cache_key(JOB_RASTER)
+    loader.threshold += 10
+    assert loader.cache_key(JOB_RASTER) == key
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+
+from processing.job_cache import JobCache
+
+
+def test_truncated_entry_is_a_miss_and_removed(tmp_path):
+    cache = JobCache(str(tmp_path))
+    cache.put("a", mask=np.ones((4, 4), dtype=np.uint8), segments=np.zeros((2, 4), dtype=np.int32))
+    path = cache.path("a")
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+    assert cache.get("a") is None
+    assert cache.misses == 1
+    assert not os.path.exists(path)
+
+
+def test_entry_without_required_array_is_a_miss_and_removed(tmp_path):
+    cache = JobCache(str(tmp_path))
+    cache.put("a", mask=np.ones((4, 4), dtype=np.uint8))
+
+    assert cache.get("a", required=("mask", "segments")) is None
+    assert cache.misses == 1
+    assert not os.path.exists(cache.path("a"))
+
+
+def test_hit_returns_arrays(tmp_path):
+    cache = JobCache(str(tmp_path))
+    cache.put("a", mask=np.ones((4, 4), dtype=np.uint8))
+
+    data = cache.get("a", required=("mask",))
+    assert data["mask"].shape == (4, 4)
+    assert cache.hits == 1
@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+import pytest
+
+from processing.job_file import HEADER_SIZE, JobFile, read_job_stream, write_job
+
+
+def make_job(tmp_path, count=1000):
+    rng = np.random.default_rng(7)
+    segments = rng.integers(0, 5000, (count, 4)).astype(np.int32)
+    powers = rng.integers(0, 1000, count).astype(np.uint16)
+    speeds = rng.integers(0, 300, count).astype(np.float32)
+    path = str(tmp_path / "job.lzjob")
+    write_job(path, segments, 5000, 5000, powers, speeds, speed=120)
+    return path, segments, powers, speeds
+
+
+def test_round_trip_through_mmap_and_stream(tmp_path):
+    path, segments, powers, speeds = make_job(tmp_path)
+
+    job = JobFile(path)
+    assert (job.width, job.height, job.speed, len(job)) == (5000, 5000, 120, len(segments))
+    chunks = list(job.chunks(size=300))
+    assert len(chunks) == 4
+    assert np.array_equal(np.concatenate([chunk[0] for chunk in chunks]), segments)
+    assert np.array_equal(np.concatenate([chunk[1] for chunk in chunks]), powers)
+    assert np.array_equal(np.concatenate([chunk[2] for chunk in chunks]), speeds)
+
+    with open(path, "rb") as f:
+        header, stream_chunks = read_job_stream(f, size=300)
+        streamed = list(stream_chunks)
+    assert header["count"] == len(segments)
+    assert np.array_equal(np.concatenate([chunk[0] for chunk in streamed]), segments)
+
+
+def test_corrupted_records_are_detected(tmp_path):
+    path, _, _, _ = make_job(tmp_path)
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE + 100)
+        byte = f.read(1)
+        f.seek(HEADER_SIZE + 100)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    with pytest.raises(ValueError):
+        JobFile(path)
+    assert not JobFile(path, verify=False).verify()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    _, chunks = read_job_stream(io.BytesIO(data))
+    with pytest.raises(ValueError):
+        list(chunks)
@@ -0,0 +1,113 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from controllers.gcode import feed_rate
+from controllers.gcode_sender import GcodeSender
+from controllers.grbl_emulator import GrblEmulator
+from controllers.job_scheduler import JobScheduler, Machine, ScheduledJob, start_emulated_machines
+from processing.job_file import write_job
+from processing.toolpath import raster_runs, runs_to_segments
+from scheduler import load_jobs
+
+
+def make_segments(seed, shape=(20, 30)):
+    mask = np.random.default_rng(seed).random(shape) < 0.4
+    return runs_to_segments(raster_runs(mask))
+
+
+def test_jobs_complete_on_all_machines():
+    machines, emulators = start_emulated_machines(3, block_time=0.0001)
+    scheduler = JobScheduler(machines)
+    jobs = [scheduler.submit(ScheduledJob(f"job-{index}", make_segments(index), speed=100))
+            for index in range(7)]
+    try:
+        report = asyncio.run(scheduler.run())
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    assert all(job.finished is not None and "error" not in job.result for job in jobs)
+    assert sum(row["jobs"] for row in report.values()) == len(jobs)
+    assert sum(row["lines"] for row in report.values()) == sum(len(emulator.lines) for emulator in emulators)
+    for row in report.values():
+        assert row["jobs"] > 0
+        assert row["errors"] == []
+        assert 0 < row["utilisation"] <= 1
+
+
+def test_per_segment_speeds_reach_gcode(tmp_path):
+    segments = make_segments(1)
+    speeds = np.zeros(len(segments), dtype=np.float32)
+    speeds[0] = 50
+    write_job(str(tmp_path / "a.lzjob"), segments, speeds=speeds, speed=100)
+
+    job, = load_jobs([str(tmp_path / "*.lzjob")])
+    gcode = list(job.gcode())
+
+    assert any(line.endswith(f"F{feed_rate(50):g}") for line in gcode)
+    assert any(line.endswith(f"F{feed_rate(100):g}") for line in gcode)
+
+
+def test_interrupted_job_does_not_leak_into_the_next():
+    with GrblEmulator(block_time=0.0001) as emulator:
+        machine = Machine("laser-1", emulator.port)
+        machine.sender.timeout = 5
+        with machine.sender:
+            broken = ScheduledJob("broken", make_segments(2))
+            broken.gcode = lambda: iter(["G0 X1 Y1"] * 10 + ["G1 X" + "1" * 200])
+            with pytest.raises(ValueError):
+                machine.stream(broken)
+
+            result = machine.stream(ScheduledJob("next", make_segments(3)))
+            with pytest.raises(TimeoutError):
+                machine.sender.read_line(timeout=0.3)  # Лишних «ok» в очереди ответов нет
+
+        assert emulator.stats()["resets"] == 1
+    assert result["errors"] == []
+    assert machine.sender.errors == []
+
+
+def test_errors_are_reported_per_stream():
+    with GrblEmulator() as emulator, GcodeSender(emulator.port, timeout=5) as sender:
+        sender.errors.append("error:20")
+        assert sender.stream(["G0 X1 Y1"])["errors"] == []
+
+
+def test_failed_reset_keeps_the_original_error():
+    with GrblEmulator(block_time=0.0001) as emulator:
+        machine = Machine("laser-1", emulator.port)
+        machine.sender.timeout = 5
+        with machine.sender:
+            def reset(timeout=None):
+                raise TimeoutError("нет приветствия")
+            machine.sender.reset = reset
+            broken = ScheduledJob("broken", make_segments(2))
+            broken.gcode = lambda: iter(["G1 X" + "1" * 200])
+            with pytest.raises(ValueError):
+                machine.stream(broken)
+
+    assert machine.errors == ["сброс контроллера: нет приветствия"]
+
+
+def test_jobs_from_files_stream_in_chunks_and_corruption_stops_them(tmp_path):
+    from processing.job_file import HEADER_SIZE
+
+    write_job(str(tmp_path / "good.lzjob"), make_segments(4), speed=100)
+    write_job(str(tmp_path / "bad.lzjob"), make_segments(5), speed=100)
+    with open(tmp_path / "bad.lzjob", "r+b") as f:
+        f.seek(HEADER_SIZE)
+        f.write(b"\xff\xff")
+
+    jobs = {job.name: job for job in load_jobs([str(tmp_path / "*.lzjob")])}
+    assert list(jobs["good"].gcode()) == list(ScheduledJob("good", make_segments(4), speed=100).gcode())
+
+    with GrblEmulator(block_time=0.0001) as emulator:
+        machine = Machine("laser-1", emulator.port)
+        machine.sender.timeout = 5
+        with machine.sender:
+            with pytest.raises(ValueError):
+                machine.stream(jobs["bad"])
+            assert machine.stream(jobs["good"])["errors"] == []
+        assert emulator.stats()["resets"] == 0
@@ -0,0 +1,23 @@
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from ui.laser_view import LaserView
+
+
+def test_static_layer_is_rebuilt_only_when_its_key_changes():
+    app = QApplication.instance() or QApplication([])
+    view = LaserView()
+    view.resize(400, 300)
+
+    layer = view.render_static_layer()
+    view.update_position(50, 50)
+    view.add_trail(10, 10)
+    view.add_trail(60, 60)
+    assert view.render_static_layer() is layer
+
+    view.set_laser_path(np.array([[5, 5], [6, 6]], dtype=np.uint16))
+    rebuilt = view.render_static_layer()
+    assert rebuilt is not layer
+
+    view.resize(500, 300)
+    assert view.render_static_layer() is not rebuilt
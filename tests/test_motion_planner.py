@@ -0,0 +1,15 @@
+import time
+
+from controllers.motion_planner import MotionPlanner
+
+
+def test_cancel_stops_building_blocks():
+    planner = MotionPlanner(2000, 0.05)
+    moves = [(x % 500, x // 500, True) for x in range(1, 2_000_000)]
+    planner.start(moves, (0, 0), 300)
+
+    started = time.monotonic()
+    planner.cancel()
+
+    assert time.monotonic() - started < 0.5
+    assert planner.horizon()[1]
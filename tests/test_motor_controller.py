@@ -0,0 +1,35 @@
+import time
+
+from PyQt6.QtWidgets import QApplication
+
+from controllers.motor_controller import MotorController
+from ui.laser_view import LaserView
+
+
+def tick(motor, elapsed):
+    """Опрос планировщика так, будто с начала движения прошло elapsed секунд."""
+    motor.planner.thread.join()
+    motor.start_time = time.monotonic() - elapsed
+    motor.update_position()
+
+
+def test_laser_toggle_applies_during_manual_move():
+    app = QApplication.instance() or QApplication([])
+    view = LaserView()
+    motor = MotorController(view)
+    motor.set_speed(100)
+    motor.move_to(400, 0)
+    motor.timer.stop()
+
+    tick(motor, 0.5)
+    assert len(view.trail) == 0
+
+    # Как MainWindow.toggle_laser: лазер включают посреди перемещения
+    motor.drawing = True
+    view.add_trail(None, None)
+    tick(motor, 1.0)
+    tick(motor, 1.5)
+
+    assert motor.drawing
+    assert len(view.trail) >= 2
+    assert view.trail.points[len(view.trail) - 1][0] > view.trail.points[0][0]
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Отдельный процесс: предупреждения resource_tracker печатаются при его завершении
+SCRIPT = """
+import numpy as np
+from processing.extraction import mask_to_points
+from processing.job_cache import pack_mask
+from processing.parallel import extract_mask_parallel, extract_points_parallel
+
+if __name__ == "__main__":
+    gray = np.random.default_rng(0).integers(0, 255, (2000, 500), dtype=np.uint8)
+    points = extract_points_parallel(gray, 127, block_rows=64, workers=2)
+    assert np.array_equal(points, mask_to_points(gray <= 127))
+
+    packed, points = extract_mask_parallel(gray[:, :499], 127, block_rows=64, workers=2, dtype=np.uint16)
+    assert points.dtype == np.uint16
+    assert np.array_equal(points, mask_to_points(gray[:, :499] <= 127, np.uint16))
+    assert np.array_equal(packed, pack_mask(gray[:, :499] <= 127))
+
+    calls = []
+    def cancelled():
+        calls.append(1)
+        return len(calls) > 1
+    assert extract_points_parallel(gray, 127, block_rows=64, workers=2, cancelled=cancelled) is None
+    print("ok")
+"""
+
+
+def test_parallel_extraction_and_cancel_leave_no_shared_memory():
+    completed = subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, capture_output=True,
+                               text=True, timeout=120, env=dict(os.environ, PYTHONPATH=ROOT))
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "ok"
+    assert "resource_tracker" not in completed.stderr
+    assert "KeyError" not in completed.stderr
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from processing.simulate import JobSimulator, hotspots, segment_pixels
+
+
+def test_density_covers_burned_pixels_with_burn_time():
+    segments = np.array([[0, 1, 4, 1], [9, 3, 5, 3]], dtype=np.int32)
+    simulator = JobSimulator(segments, (5, 10), feed=20)
+
+    density = simulator.density()
+
+    assert sorted(zip(*np.nonzero(density))) == [(1, x) for x in range(4)] + [(3, x) for x in range(5, 9)]
+    assert density.sum() == pytest.approx(simulator.burn_times().sum())
+    assert simulator.density(until=0).sum() == 0
+
+
+def test_power_scales_density_and_overlap_is_a_hotspot():
+    segments = np.array([[0, 0, 6, 0], [6, 2, 0, 2], [2, 2, 3, 2]], dtype=np.int32)
+    full = JobSimulator(segments, (3, 6), feed=20).density()
+    half = JobSimulator(segments, (3, 6), feed=20, powers=np.full(3, 500)).density()
+
+    assert half == pytest.approx(full / 2)
+    assert hotspots(full, factor=1.5).tolist() == [[2, 2]]
+
+
+def test_segment_pixels_match_pixel_edge_lengths():
+    xs, ys, owner = segment_pixels(np.array([[3, 0, 0, 0], [0, 0, 0, 4]]))
+    assert list(zip(xs, ys, owner)) == [(2, 0, 0), (1, 0, 0), (0, 0, 0),
+                                        (0, 0, 1), (0, 1, 1), (0, 2, 1), (0, 3, 1)]
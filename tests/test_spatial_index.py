@@ -0,0 +1,39 @@
+import numpy as np
+
+from ui.spatial_index import SegmentGrid
+
+
+def brute_force(segments, x0, y0, x1, y1):
+    inside = (
+        (np.maximum(segments[:, 0], segments[:, 2]) >= x0)
+        & (np.minimum(segments[:, 0], segments[:, 2]) <= x1)
+        & (np.maximum(segments[:, 1], segments[:, 3]) >= y0)
+        & (np.minimum(segments[:, 1], segments[:, 3]) <= y1)
+    )
+    return segments[inside]
+
+
+def as_set(segments):
+    return set(map(tuple, segments.tolist()))
+
+
+def test_query_matches_brute_force_with_indexed_and_tail_segments():
+    rng = np.random.default_rng(3)
+    segments = rng.integers(0, 500, size=(3000, 4)).astype(np.int32)
+    grid = SegmentGrid(500, 500, cell_size=32)
+    grid.extend(segments[:2500])  # Попадает в индекс
+    grid.extend(segments[2500:])  # Остаётся в хвосте
+    assert grid.indexed < len(grid) == len(segments)
+
+    for rect in [(0, 0, 499, 499), (100, 40, 180, 90), (300, 300, 300, 300), (-50, -50, 10, 10)]:
+        assert as_set(grid.query(*rect)) == as_set(brute_force(segments, *rect))
+        assert grid.estimate(*rect) >= len(grid.query(*rect))
+
+
+def test_clear_empties_the_grid():
+    grid = SegmentGrid(64, 64)
+    grid.extend([[0, 0, 10, 10]])
+    grid.rebuild()
+    grid.clear()
+    assert len(grid) == 0
+    assert len(grid.query(0, 0, 63, 63)) == 0
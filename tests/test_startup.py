@@ -0,0 +1,8 @@
+from benchmarks.startup import check
+
+
+def test_startup_loads_no_lazy_modules():
+    # Бюджеты с запасом: тест ловит загрузку LAZY_MODULES при старте
+    # и грубые регрессии, а не колебания скорости машины
+    medians, problems = check(repeat=1, import_budget=2.0, startup_budget=3.0)
+    assert problems == [], problems
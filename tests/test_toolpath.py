@@ -0,0 +1,73 @@
+import numpy as np
+
+from controllers.gcode import segments_to_gcode
+from processing.dither import DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS, power_levels
+from processing.pipeline import burn_length, burn_mask, build_power_segments
+from processing.toolpath import raster_runs, runs_to_segments
+
+
+def gcode_burn_length(lines):
+    """Длина ходов G1 с включённым лазером; ходы нулевой длины недопустимы."""
+    x = y = 0.0
+    laser_on = False
+    total = 0.0
+    for line in lines:
+        words = dict((word[0], word[1:]) for word in line.split()[1:])
+        if line.startswith("M3"):
+            laser_on = True
+        elif line.startswith("M5"):
+            laser_on = False
+        elif line.startswith(("G0", "G1")):
+            nx, ny = float(words.get("X", x)), float(words.get("Y", y))
+            if line.startswith("G1") and laser_on:
+                assert (nx, ny) != (x, y), line
+                total += np.hypot(nx - x, ny - y)
+            x, y = nx, ny
+    return total
+
+
+def test_single_pixel_run_has_length_one():
+    mask = np.zeros((4, 6), dtype=bool)
+    mask[0, 2] = True
+    mask[1, 4] = True  # Вторая непустая строка идёт справа налево
+
+    segments = runs_to_segments(raster_runs(mask))
+
+    assert segments.tolist() == [[2, 0, 3, 0], [5, 1, 4, 1]]
+    assert burn_length(segments) == 2
+
+
+def test_burn_length_equals_burned_pixels():
+    mask = np.random.default_rng(1).random((40, 60)) < 0.3
+    for bidirectional in (True, False):
+        segments = runs_to_segments(raster_runs(mask, bidirectional))
+        assert burn_length(segments) == np.count_nonzero(mask)
+
+
+def test_isolated_pixels_are_burned():
+    mask = np.zeros((3, 3), dtype=bool)
+    mask[1, 1] = True
+
+    gcode = list(segments_to_gcode(runs_to_segments(raster_runs(mask)), speed=10))
+
+    assert "G1 X2 Y1 F600" in gcode
+
+
+def test_dithered_gcode_burns_every_pixel_once():
+    gray = np.random.default_rng(2).integers(0, 256, (30, 40), dtype=np.uint8)
+    for dither in (DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS):
+        mask = burn_mask(gray, dither=dither)
+        segments = runs_to_segments(raster_runs(mask))
+
+        assert burn_length(segments) == np.count_nonzero(mask)
+        assert gcode_burn_length(segments_to_gcode(segments, speed=10)) == np.count_nonzero(mask)
+
+
+def test_power_segments_burn_every_pixel_once():
+    gray = np.random.default_rng(3).integers(0, 256, (30, 40), dtype=np.uint8)
+    for bidirectional in (True, False):
+        segments, powers = build_power_segments(gray, bidirectional)
+        gcode = segments_to_gcode(segments, speed=10, powers=powers)
+
+        assert burn_length(segments) == np.count_nonzero(power_levels(gray))
+        assert gcode_burn_length(gcode) == np.count_nonzero(power_levels(gray))
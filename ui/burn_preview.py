@@ -0,0 +1,85 @@
+import math
+import time
+
+import numpy as np
+
+PREVIEW_FPS = 30  # Частота кадров анимации прожига
+
+
+class BurnPreview:
+    """
+    Анимация прожига за заданное время.
+
+    Число точек на кадр вычисляется по прошедшему времени: к моменту t
+    прожжено N * t / duration точек (или rate * t при заданной скорости
+    воспроизведения). Холст simulation — в размере показа: каждый его пиксель
+    собирает блок пикселей изображения и темнеет пропорционально доле
+    прожжённых в блоке (как уменьшение INTER_AREA), поэтому полноразмерная
+    копия изображения для анимации не нужна.
+    """
+
+    def __init__(self, simulation, points, shape, duration_ms=5000, rate=None):
+        self.simulation = simulation  # uint8 в размере показа, сюда «прожигаются» пиксели
+        self.points = np.asarray(points).reshape(-1, 2)
+        height, width = shape         # Размер изображения, к которому относятся точки
+
+        # Строка и столбец холста для каждой строки и столбца изображения
+        rows, columns = simulation.shape
+        self.row_map = np.arange(height, dtype=np.intp) * rows // height
+        self.column_map = np.arange(width, dtype=np.intp) * columns // width
+        # Сколько пикселей изображения приходится на каждый пиксель холста
+        self.area = np.outer(np.bincount(self.row_map, minlength=rows),
+                             np.bincount(self.column_map, minlength=columns))
+        self.burned = np.zeros(simulation.shape, dtype=np.int64)
+
+        self.duration = duration_ms / 1000
+        self.rate = rate              # Точек в секунду; если задано, важнее duration
+        self.index = 0
+        self.started = None
+
+    @property
+    def total(self):
+        return len(self.points)
+
+    def done(self):
+        return self.index >= self.total
+
+    def start(self):
+        """Начинает анимацию заново: холст очищается до белого вместе со счётчиками."""
+        self.index = 0
+        self.burned[...] = 0
+        self.simulation[...] = 255
+        self.started = time.monotonic()
+
+    def target_index(self, elapsed):
+        """Сколько точек должно быть прожжено через elapsed секунд."""
+        if self.rate is not None:
+            target = self.rate * elapsed
+        elif self.duration > 0:
+            target = self.total * elapsed / self.duration
+        else:
+            target = self.total
+        return min(self.total, math.ceil(target))
+
+    def advance(self):
+        """Прожигает точки, положенные к текущему моменту; возвращает True, если кадр изменился."""
+        if self.started is None:
+            self.start()
+
+        end = self.target_index(time.monotonic() - self.started)
+        if end <= self.index:
+            return False
+
+        chunk = self.points[self.index:end]
+        rows = self.row_map[chunk[:, 1]]
+        columns = self.column_map[chunk[:, 0]]
+        self.index = end
+
+        # Точки идут построчно, поэтому меняется узкая полоса строк холста
+        first, last = int(rows.min()), int(rows.max()) + 1
+        width = self.simulation.shape[1]
+        counts = np.bincount((rows - first) * width + columns, minlength=(last - first) * width)
+        burned = self.burned[first:last]
+        burned += counts.reshape(last - first, width)
+        self.simulation[first:last] = 255 - burned * 255 // self.area[first:last]
+        return True
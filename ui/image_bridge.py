@@ -0,0 +1,90 @@
+import numpy as np
+from PyQt6.QtGui import QImage
+
+
+def array_to_qimage(array):
+    """
+    Оборачивает массив NumPy в QImage без копирования пикселей.
+
+    Поддерживаются uint8 h×w (оттенки серого), h×w×3 (BGR, как у OpenCV)
+    и h×w×4 (BGRA). Массив сохраняется в атрибуте QImage, поэтому буфер
+    живёт, пока жив возвращённый объект; держите ссылку на QImage,
+    а не только на его копии внутри Qt.
+    """
+    if array.dtype != np.uint8:
+        raise ValueError(f"Ожидался массив uint8, получен {array.dtype}")
+
+    array = np.ascontiguousarray(array)
+    height, width = array.shape[:2]
+    if array.ndim == 2:
+        image_format = QImage.Format.Format_Grayscale8
+    elif array.shape[2] == 3:
+        image_format = QImage.Format.Format_BGR888
+    elif array.shape[2] == 4:
+        image_format = QImage.Format.Format_ARGB32  # В памяти little-endian это B, G, R, A
+    else:
+        raise ValueError(f"Неподдерживаемая форма массива: {array.shape}")
+
+    image = QImage(array.data, width, height, array.strides[0], image_format)
+    image.array = array  # Держим буфер, пока жив QImage
+    return image
+
+
+def mask_array(points, width, height):
+    """
+    Массив uint8 размером width×height: белый фон и чёрные пиксели
+    в точках (N, 2). Точки вне поля отбрасываются.
+    """
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+    points = np.asarray(points).reshape(-1, 2)
+    xs, ys = points[:, 0], points[:, 1]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    canvas[ys[inside], xs[inside]] = 0
+    return canvas
+
+
+def mask_pyramid(canvas, min_size=16):
+    """
+    Пирамида уменьшенных копий маски: уровень i в 2**i раз меньше исходного.
+    Уменьшение берёт минимум по блоку 2×2, поэтому тонкие чёрные линии
+    не пропадают на мелком масштабе. Возвращает список QImage, начиная с исходного.
+    """
+    levels = [array_to_qimage(canvas)]
+    level = canvas
+    while min(level.shape) >= 2 * min_size:
+        height, width = level.shape
+        padded = np.pad(level, ((0, height % 2), (0, width % 2)), constant_values=255)
+        level = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).min(axis=(1, 3))
+        levels.append(array_to_qimage(level))
+    return levels
+
+
+class ScaledImage:
+    """
+    Уменьшенная копия изображения для показа в интерфейсе.
+
+    Буфер уменьшенной копии и QImage поверх него создаются один раз;
+    refresh() пересчитывает пиксели в тот же буфер без новых выделений памяти.
+    """
+
+    def __init__(self, source, max_height=300):
+        self.source = source
+        height, width = source.shape[:2]
+        if height > max_height:
+            self.size = (int(width * max_height / height), max_height)
+            self.buffer = np.empty((self.size[1], self.size[0]) + source.shape[2:], dtype=source.dtype)
+            self.refresh()
+        else:
+            # Маленькое изображение показываем как есть, без копии
+            self.size = (width, height)
+            self.buffer = np.ascontiguousarray(source)
+        self.image = array_to_qimage(self.buffer)
+
+    def matches(self, source):
+        return source is self.source
+
+    def refresh(self):
+        """Пересчитывает уменьшенную копию после изменения исходного массива."""
+        if self.buffer is not self.source:
+            import cv2  # OpenCV загружается при первом уменьшении, а не при старте
+            cv2.resize(self.source, self.size, dst=self.buffer, interpolation=cv2.INTER_AREA)
@@ -3,13 +3,78 @@ import numpy as np
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 from PyQt6.QtCore import Qt
 
+from processing.extraction import (
+    to_gray, mask_to_points, coordinate_dtype, DEFAULT_THRESHOLD, MODE_LUMA, MODE_LIGHTNESS
+)
+from processing.parallel import extract_mask_parallel
+from processing.pipeline import build_segments, burn_mask, build_power_segments, JOB_RASTER, JOB_CONTOUR
+from processing.dither import DITHER_NONE, DITHER_POWER
+from processing.tiled import open_source, TiledProcessor
+from processing.toolpath import runs_to_segments, serpentine_runs
+from processing.job_cache import JobCache, file_digest
+from processing.burn_mask import BurnMask, MaskPreview, display_size
+from processing.threshold_index import ThresholdIndex
+import config
+import metrics
+
+
+def load_preview(file_path, height, max_height):
+    """
+    Цветная копия изображения для показа, не выше max_height.
+    JPEG декодируется сразу уменьшенным (IMREAD_REDUCED_*), полная копия не хранится.
+    """
+    flags = cv2.IMREAD_COLOR
+    for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                            (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if height // factor >= max_height:
+            flags = reduced
+            break
+    image = cv2.imread(file_path, flags)
+    if image is None:
+        return None
+    size = display_size(image.shape[1], image.shape[0], max_height)
+    if size != (image.shape[1], image.shape[0]):
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return image
+
 
 class ImageLoader:
     def __init__(self):
-        self.original_image = None
+        self.file_path = None
+        self.original_image = None  # Копия для показа, не выше config.PREVIEW_HEIGHT
+        self.gray_image = None  # Исходные яркости: порог можно менять без перезагрузки файла
+        # Маска прожига задания, 1 бит на пиксель (BurnMask). Всё остальное —
+        # превью маски binary_image и холст анимации laser_simulation —
+        # производные от неё, в размере показа.
+        self.mask = None
         self.binary_image = None
         self.laser_simulation = None
-        self.points = []
+        self.points = np.empty((0, 2), dtype=np.uint16)  # Точки прожига, тип — coordinate_dtype()
+        self.segments = np.empty((0, 4), dtype=np.int32)  # Отрезки прожига (x0, y0, x1, y1)
+        self.threshold = DEFAULT_THRESHOLD
+        self.mode = MODE_LUMA  # Способ перевода в яркость: MODE_LUMA или MODE_LIGHTNESS
+        self.dither = DITHER_NONE  # Порог, дизеринг или модуляция мощности (processing.dither)
+        self.segment_powers = None  # Мощность каждого отрезка в режиме DITHER_POWER
+
+        # Большие изображения: обработка полосами, в памяти только уменьшенная копия.
+        # Тогда original_image, mask и points относятся к уменьшенной копии,
+        # а траектория строится в полном разрешении.
+        self.tiled = None
+        self.tiled_runs = None
+
+        # Индекс яркостей для мгновенной смены порога и превью его маски
+        # в размере показа (строятся по требованию)
+        self.threshold_index = None
+        self.threshold_preview = None
+
+        # Кэш обработанных заданий: повторная загрузка того же файла
+        # с теми же параметрами не требует повторной обработки.
+        # Хэш файла считается в потоке обработки (load_cached), не в GUI.
+        self.file_digest = None
+        try:
+            self.job_cache = JobCache()
+        except OSError:
+            self.job_cache = None
 
     def load_image(self):
         """Открывает диалог выбора файла и загружает изображение"""
@@ -22,44 +87,270 @@ class ImageLoader:
         if not file_path:
             return None
 
-        self.original_image = cv2.imread(file_path)
-        self.binary_image = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+        return self.load_file(file_path)
 
-        if self.binary_image is None:
+    @metrics.timed("lazer_image_stage_seconds", stage="load")
+    def load_file(self, file_path):
+        """Загружает изображение из файла без диалога"""
+        try:
+            source = open_source(file_path)
+        except ValueError:
             QMessageBox.warning(None, "Ошибка", "Не удалось загрузить изображение")
             return None
 
+        height, width = source.shape
+        self.file_path = file_path
+        self.tiled_runs = None
+        self.threshold_index = None
+        self.mask = None
+        self.binary_image = None
+        self.laser_simulation = None
+        self.file_digest = None
+        if height * width >= config.TILED_MIN_PIXELS:
+            # Файл не читается целиком: полосы берутся при обработке
+            # Отрезки копятся построчно, «змейкой» их упорядочивает build_toolpath()
+            self.tiled = TiledProcessor(source, self.threshold, bidirectional=False)
+            self.original_image = self.tiled.preview_gray
+            self.gray_image = self.tiled.preview_gray
+            print(f"🔹 Большое изображение {width}×{height}: обработка полосами, "
+                  f"превью уменьшено в {self.tiled.factor} раз")
+            return file_path
+
+        self.tiled = None
+        self.original_image = load_preview(file_path, height, config.PREVIEW_HEIGHT)
+        self.gray_image = np.array(source.read_band(0, height))
         return file_path
 
-    def process_image(self):
-        """Бинаризует изображение и собирает точки, где пиксель чёрный (0)."""
-        if self.binary_image is None:
-            return None
+    def source_gray(self):
+        """Яркости, к которым применяется порог (с учётом режима перевода цвета)."""
+        if self.tiled is None and self.mode == MODE_LIGHTNESS and self.file_path is not None:
+            # Цветное изображение не хранится: перечитываем файл только для этого режима
+            image = cv2.imread(self.file_path)
+            if image is not None:
+                return to_gray(image, MODE_LIGHTNESS)
+        return self.gray_image
 
-        _, self.binary_image = cv2.threshold(
-            self.binary_image, 127, 255, cv2.THRESH_BINARY
-        )
+    def set_mask(self, mask):
+        """
+        Запоминает маску прожига (BurnMask) и пересчитывает её превью.
+        Индекс порога построен по прежней маске и строится заново по требованию.
+        """
+        self.mask = mask
+        self.threshold_index = None
+        self.binary_image = mask.preview(config.PREVIEW_HEIGHT)
 
-        self.points = []
-        height, width = self.binary_image.shape
+    @metrics.timed("lazer_image_stage_seconds", stage="process")
+    def process_image(self, progress=None, cancelled=None):
+        """
+        Бинаризует изображение и собирает точки, где пиксель чёрный (0).
+        progress(done, total) сообщает о ходе обработки по полосам/блокам;
+        если cancelled() вернёт True, обработка прерывается и возвращается None.
+        """
+        if self.tiled is not None:
+            return self.process_tiled(progress, cancelled)
 
-        for y in range(height):
-            for x in range(width):
-                # Если пиксель чёрный
-                if self.binary_image[y, x] == 0:
-                    self.points.append((x, y))
+        if self.gray_image is None:
+            return None
+
+        gray = self.source_gray()
+        dtype = coordinate_dtype(gray.shape[1], gray.shape[0])
+        if self.dither == DITHER_NONE and gray.size >= config.PARALLEL_MIN_PIXELS:
+            # Маска (по битам) и точки строятся одним разбором по блокам в пуле процессов
+            result = extract_mask_parallel(gray, self.threshold, progress=progress,
+                                           cancelled=cancelled, dtype=dtype)
+            if result is None:
+                print("⚠️ Обработка отменена")
+                return None
+            packed, points = result
+            self.set_mask(BurnMask(packed, gray.shape))
+        else:
+            mask = burn_mask(gray, self.threshold, self.dither)
+            points = mask_to_points(mask, dtype)
+            if progress:
+                progress(1, 1)
+            self.set_mask(BurnMask.from_mask(mask))
+
+        # Массив (N, 2) координат (x, y) чёрных пикселей
+        self.points = points
 
         print(f"🔹 Найдено {len(self.points)} точек для лазера")
         return self.points
 
+    @metrics.timed("lazer_image_stage_seconds", stage="bands")
+    def process_tiled(self, progress=None, cancelled=None):
+        """
+        Обрабатывает большое изображение полосами: растровые отрезки
+        копятся в полном разрешении, точки — только для уменьшенной копии.
+        Полосами считается только порог по яркости (MODE_LUMA): дизеринг
+        и MODE_LIGHTNESS требуют всего изображения, для них ValueError.
+        """
+        if self.dither != DITHER_NONE:
+            raise ValueError("Дизеринг больших изображений не поддерживается: выберите «Порог»")
+        if self.mode != MODE_LUMA:
+            raise ValueError("Большие изображения переводятся в яркость только по MODE_LUMA")
+        self.tiled.threshold = self.threshold
+        self.tiled.points_count = 0
+
+        runs = []
+        total = self.tiled.band_count()
+        for index, (_, _, _, band_runs) in enumerate(self.tiled.bands(), start=1):
+            if cancelled and cancelled():
+                print("⚠️ Обработка отменена")
+                return None
+            runs.append(band_runs)
+            if progress:
+                progress(index, total)
+        self.tiled_runs = np.concatenate(runs)
+
+        self.original_image = self.tiled.preview_gray
+        self.set_mask(BurnMask.from_mask(self.tiled.preview_binary == 0))
+        self.points = self.mask.points()
+
+        print(f"🔹 Найдено {self.tiled.points_count} точек для лазера "
+              f"({len(self.points)} в превью)")
+        return self.points
+
+    def set_threshold(self, threshold):
+        """
+        Мгновенно меняет порог: маска индекса и превью binary_image
+        обновляются на месте только для пикселей из корзин яркости между
+        старым и новым порогом. Упакованная маска, точки и траектория
+        пересчитываются отдельно, в commit_threshold().
+        """
+        if self.gray_image is None or self.mask is None or self.dither != DITHER_NONE:
+            # При дизеринге порог не участвует в обработке
+            self.threshold = threshold
+            self.threshold_index = None
+            return
+
+        if self.threshold_index is None:
+            self.threshold_index = ThresholdIndex(self.source_gray(), self.threshold)
+            self.threshold_preview = MaskPreview(self.threshold_index.mask, config.PREVIEW_HEIGHT)
+
+        self.threshold_index.apply(threshold, self.threshold_preview)
+        self.threshold = self.threshold_index.threshold
+        self.binary_image = self.threshold_preview.image
+
+    @metrics.timed("lazer_image_stage_seconds", stage="threshold")
+    def commit_threshold(self):
+        """Пересчитывает точки по выбранному порогу; траекторию затем строит build_toolpath()."""
+        if self.threshold_index is None:
+            return self.points
+
+        self.mask = BurnMask.from_mask(self.threshold_index.mask)
+        self.points = self.mask.points()
+        if self.tiled is not None:
+            # Отрезки полного разрешения пересчитаются полосами при построении траектории
+            self.tiled_runs = None
+        return self.points
+
+    def needs_processing(self, job_type):
+        """
+        Нужна ли обработка полосами перед build_toolpath(): для растра большого
+        изображения отрезки полного разрешения считаются заново после смены
+        порога или загрузки из кэша. Её запускают в ImageProcessingTask, не в GUI.
+        """
+        return self.tiled is not None and job_type == JOB_RASTER and self.tiled_runs is None
+
+    @metrics.timed("lazer_image_stage_seconds", stage="toolpath")
+    def build_toolpath(self, job_type=JOB_RASTER, bidirectional=True, epsilon=1.0):
+        """
+        Строит траекторию задания:
+        JOB_RASTER — по одному отрезку на каждую серию чёрных пикселей в строке;
+        JOB_CONTOUR — упрощённые контуры в порядке, сокращающем холостые переезды.
+        """
+        if self.mask is None:
+            return None
+
+        self.segment_powers = None
+        if self.tiled is None and self.dither == DITHER_POWER and job_type == JOB_RASTER:
+            self.segments, self.segment_powers = build_power_segments(self.source_gray(), bidirectional)
+        elif self.tiled is not None:
+            if job_type == JOB_RASTER:
+                if self.tiled_runs is None:
+                    self.process_tiled()
+                runs = serpentine_runs(self.tiled_runs) if bidirectional else self.tiled_runs
+                self.segments = runs_to_segments(runs)
+            else:
+                # Полного бинарного изображения нет: контуры берутся с превью
+                preview = build_segments(self.mask.binary_image(), job_type, bidirectional, epsilon)
+                self.segments = preview * self.tiled.factor
+        else:
+            self.segments = build_segments(self.mask.binary_image(), job_type, bidirectional, epsilon)
+
+        print(f"🔹 Траектория: {len(self.segments)} отрезков вместо {len(self.points)} точек")
+        return self.segments
+
+    def cache_key(self, job_type, bidirectional=True, epsilon=1.0):
+        """Ключ кэша: только параметры, от которых зависит результат обработки."""
+        params = {"job_type": job_type, "tiled": self.tiled is not None}
+        if self.dither == DITHER_NONE:
+            params["threshold"] = self.threshold
+        else:
+            params["dither"] = self.dither
+        if self.tiled is None:
+            params["mode"] = self.mode  # Большие изображения — всегда MODE_LUMA
+        if job_type == JOB_RASTER:
+            params["bidirectional"] = bidirectional
+        else:
+            params["epsilon"] = epsilon
+        return JobCache.make_key(self.file_digest, **params)
+
+    @metrics.timed("lazer_image_stage_seconds", stage="cache")
+    def load_cached(self, job_type, bidirectional=True, epsilon=1.0):
+        """
+        Берёт маску и траекторию из кэша, если файл уже обрабатывался
+        с теми же параметрами. Возвращает True при попадании.
+        """
+        if self.job_cache is None or self.file_path is None:
+            return False
+        if self.file_digest is None:
+            self.file_digest = file_digest(self.file_path)
+
+        required = ("mask", "shape", "segments") + (("preview",) if self.tiled is not None else ())
+        data = self.job_cache.get(self.cache_key(job_type, bidirectional, epsilon), required)
+        if data is None:
+            return False
+
+        self.set_mask(BurnMask(data["mask"], data["shape"]))
+        self.points = self.mask.points()
+        self.segments = data["segments"]
+        self.segment_powers = data.get("powers")
+        if self.tiled is not None:
+            self.tiled.preview_gray[...] = data["preview"]
+            self.original_image = self.gray_image = self.tiled.preview_gray
+            self.tiled_runs = None
+
+        print(f"🔹 Задание взято из кэша: {len(self.points)} точек, {len(self.segments)} отрезков")
+        return True
+
+    def store_cached(self, job_type, bidirectional=True, epsilon=1.0):
+        """Сохраняет маску и траекторию текущего задания в кэш."""
+        if self.job_cache is None or self.file_digest is None or self.mask is None:
+            return
+
+        arrays = {
+            "mask": self.mask.packed,
+            "shape": np.array(self.mask.shape),
+            "segments": self.segments,
+        }
+        if self.segment_powers is not None:
+            arrays["powers"] = self.segment_powers
+        if self.tiled is not None:
+            arrays["preview"] = self.original_image
+        try:
+            self.job_cache.put(self.cache_key(job_type, bidirectional, epsilon), **arrays)
+        except OSError as error:
+            print(f"⚠️ Не удалось сохранить задание в кэш: {error}")
+
+    @metrics.timed("lazer_image_stage_seconds", stage="simulation")
     def create_laser_simulation(self):
         """
-        Создаёт белое цветное изображение (h×w×3)
-        для дальнейшего «прожига» пикселей.
+        Создаёт белый холст для дальнейшего «прожига» пикселей —
+        в размере показа (как binary_image), а не в полном разрешении.
         """
         if self.binary_image is None:
             return None
 
-        height, width = self.binary_image.shape
-        self.laser_simulation = np.full((height, width, 3), 255, dtype=np.uint8)
+        self.laser_simulation = np.full(self.binary_image.shape, 255, dtype=np.uint8)
         return self.laser_simulation
@@ -1,6 +1,15 @@
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QPen, QColor, QImage
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QColor, QImage, QPixmap, QTransform
+from PyQt6.QtCore import Qt, pyqtSignal, QRectF, QLineF
+
+import metrics
+from ui.trail_buffer import TrailBuffer
+from ui.image_bridge import mask_array, mask_pyramid
+from ui.spatial_index import SegmentGrid
+
+
+# Больше видимых отрезков следа выгоднее рисовать растровым слоем, чем векторами
+TRAIL_VECTOR_LIMIT = 5000
 
 
 class LaserView(QWidget):
@@ -13,14 +22,32 @@ class LaserView(QWidget):
         self.laser_position = [self.margin, self.margin]  # Текущие координаты лазера
 
         # Традиционный "след" (синяя линия) если нужно
-        self.trail = []
+        self.trail = TrailBuffer()
+        # Растровый слой следа: новые отрезки дорисовываются в него,
+        # и кадр копирует готовое изображение вместо перерисовки всей истории
+        self.trail_image = None
+        self.trail_rendered = 0  # Сколько точек следа уже нарисовано в trail_image
+        self.trail_pen = QPen(QColor(0, 0, 255), 2)
+
+        self.field_width = 500
+        self.field_height = 500
+
+        # Пространственный индекс отрезков следа: при зуме рисуются
+        # только отрезки, попадающие в перерисовываемую область
+        self.trail_index = SegmentGrid(self.field_width + 2 * self.margin,
+                                       self.field_height + 2 * self.margin)
+        self.trail_indexed = 0  # Сколько точек следа уже внесено в индекс
 
         # Новый слой для точек, загруженных из ImageLoader
         # Если он None, значит пока ничего не загружено
         self.points_image = None
+        self.points_pyramid = []  # Уменьшенные копии points_image для мелкого масштаба
+        self.path_version = 0  # Меняется при каждой смене слоя точек
 
-        self.field_width = 500
-        self.field_height = 500
+        # Кэш статических слоёв (рамка, сетка, точки): перерисовывается
+        # только при изменении размера, зума или загруженного пути
+        self.static_layer = None
+        self.static_key = None
 
         # Параметры зума
         self.zoom_enabled = False
@@ -44,74 +71,228 @@ class LaserView(QWidget):
         self.update()
 
     # Остальные методы остаются без изменений
+    def view_transform(self):
+        """Преобразование координат поля в координаты виджета с учётом зума."""
+        transform = QTransform()
+        if self.zoom_enabled:
+            if self.zoom_center is not None:
+                cx, cy = self.zoom_center
+                transform.translate(cx + self.margin, cy + self.margin)
+                transform.scale(self.zoom_factor, self.zoom_factor)
+                transform.translate(- (cx + self.margin), - (cy + self.margin))
+            else:
+                transform.scale(self.zoom_factor, self.zoom_factor)
+        return transform
+
+    def visible_field_rect(self, rect):
+        """Область поля (до зума), которая видна в прямоугольнике виджета rect."""
+        inverted, _ = self.view_transform().inverted()
+        return inverted.mapRect(QRectF(rect))
+
+    def update_field_rect(self, x, y, width, height):
+        """Запрашивает перерисовку прямоугольника, заданного в координатах поля."""
+        rect = self.view_transform().mapRect(QRectF(x, y, width, height))
+        self.update(rect.toAlignedRect().adjusted(-1, -1, 1, 1))
+
     def update_position(self, x: int, y: int):
+        # Перерисовываем только старое и новое положение красной точки
+        old_x, old_y = map(int, self.laser_position)
         self.laser_position = [x, y]
-        self.update()
+        self.update_field_rect(old_x - 5, old_y - 5, 10, 10)
+        self.update_field_rect(x - 5, y - 5, 10, 10)
 
     def add_trail(self, x: int, y: int):
-        self.trail.append((x, y))
-        self.update()
+        if x is None or y is None:
+            self.trail.add_break()
+            return
+
+        self.trail.append(x, y)
+
+        # Перерисовываем только область нового отрезка
+        if len(self.trail) > 1 and not self.trail.breaks[len(self.trail) - 1]:
+            px, py = self.trail.points[len(self.trail) - 2]
+        else:
+            px, py = x, y
+        pad = self.trail_pen.width() + 1
+        self.update_field_rect(min(px, x) - pad, min(py, y) - pad,
+                               abs(px - x) + 2 * pad, abs(py - y) + 2 * pad)
+
+    def add_trail_batch(self, points, breaks=None):
+        """
+        Добавляет пакет точек следа (N, 2) за один вызов: breaks[i] — точка i
+        начинает новый участок (см. TrailBuffer.extend). Перерисовывается одна
+        область, охватывающая все новые отрезки.
+        """
+        first = len(self.trail)
+        self.trail.extend(points, breaks)
+        if len(self.trail) == first:
+            return
+
+        # Новые отрезки могут начинаться в последней точке прежнего следа
+        changed = self.trail.points[max(0, first - 1):len(self.trail)]
+        x0, y0 = changed.min(axis=0).tolist()
+        x1, y1 = changed.max(axis=0).tolist()
+        pad = self.trail_pen.width() + 1
+        self.update_field_rect(x0 - pad, y0 - pad, x1 - x0 + 2 * pad, y1 - y0 + 2 * pad)
 
     def clear_trajectory(self):
         self.trail.clear()
+        self.trail_rendered = 0
+        self.trail_index.clear()
+        self.trail_indexed = 0
+        if self.trail_image is not None:
+            self.trail_image.fill(Qt.GlobalColor.transparent)
         self.update()
 
+    def render_trail(self):
+        """Дорисовывает в trail_image только отрезки, добавленные с прошлого кадра."""
+        if self.trail_image is None or self.trail_image.size() != self.size():
+            self.trail_image = QImage(self.size(), QImage.Format.Format_ARGB32_Premultiplied)
+            self.trail_image.fill(Qt.GlobalColor.transparent)
+            self.trail_rendered = 0
+
+        if self.trail_rendered >= len(self.trail):
+            return
+
+        segments = self.trail.segments(self.trail_rendered)
+        self.trail_rendered = len(self.trail)
+        if not len(segments):
+            return
+
+        painter = QPainter(self.trail_image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(self.trail_pen)
+        for x0, y0, x1, y1 in segments.tolist():
+            painter.drawLine(x0, y0, x1, y1)
+        painter.end()
+
+    def sync_trail_index(self):
+        """Вносит в индекс отрезки следа, добавленные с прошлого раза."""
+        if self.trail_indexed < len(self.trail):
+            self.trail_index.extend(self.trail.segments(self.trail_indexed))
+            self.trail_indexed = len(self.trail)
+
+    def draw_trail_culled(self, painter, rect):
+        """
+        Рисует векторами только те отрезки следа, что видны в области виджета rect.
+        Возвращает False, если их слишком много и лучше взять растровый слой.
+        """
+        self.sync_trail_index()
+        pad = self.trail_pen.widthF()
+        visible = self.visible_field_rect(rect).adjusted(-pad, -pad, pad, pad)
+        bounds = (visible.left(), visible.top(), visible.right(), visible.bottom())
+        if self.trail_index.estimate(*bounds) > TRAIL_VECTOR_LIMIT:
+            return False
+        segments = self.trail_index.query(*bounds)
+        if len(segments):
+            painter.setPen(self.trail_pen)
+            painter.drawLines([QLineF(x0, y0, x1, y1) for x0, y0, x1, y1 in segments.tolist()])
+        return True
+
+    def draw_points_layer(self, painter, visible):
+        """
+        Рисует слой точек: только видимую часть и с уровня пирамиды,
+        разрешение которого ближе всего к текущему масштабу.
+        """
+        scale = self.zoom_factor * self.devicePixelRatioF() if self.zoom_enabled else 1.0
+        level = 0
+        while level + 1 < len(self.points_pyramid) and scale * 2 ** (level + 1) <= 1.0:
+            level += 1
+        image = self.points_pyramid[level]
+        factor = 2 ** level
+
+        field = QRectF(self.margin, self.margin, self.points_image.width(), self.points_image.height())
+        target = field.intersected(visible)
+        if target.isEmpty():
+            return
+        source = QRectF((target.x() - self.margin) / factor, (target.y() - self.margin) / factor,
+                        target.width() / factor, target.height() / factor)
+        painter.drawImage(target, image, source)
+
     def set_laser_path(self, points):
-        self.points_image = QImage(self.field_width, self.field_height, QImage.Format.Format_RGB32)
-        self.points_image.fill(Qt.GlobalColor.white)
-        for (px, py) in points:
-            if 0 <= px < self.field_width and 0 <= py < self.field_height:
-                self.points_image.setPixel(px, py, QColor(0, 0, 0).rgb())
+        canvas = mask_array(points, self.field_width, self.field_height)
+        self.points_pyramid = mask_pyramid(canvas)
+        self.points_image = self.points_pyramid[0]
+        self.path_version += 1
         self.update()
 
     def clear_laser_path(self):
         self.points_image = None
+        self.points_pyramid = []
+        self.path_version += 1
         self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.save()
+    def render_static_layer(self):
+        """
+        Рисует рамку, сетку и слой точек в кэшированный QPixmap.
+        Кэш пересоздаётся только при смене размера, зума или пути.
+        """
+        key = (self.width(), self.height(), self.devicePixelRatioF(), self.zoom_enabled,
+               self.zoom_factor, self.zoom_center, self.path_version)
+        if self.static_layer is not None and key == self.static_key:
+            return self.static_layer
 
-        # Применяем зум: если включён, масштабируем относительно zoom_center
-        if self.zoom_enabled:
-            if self.zoom_center is not None:
-                cx, cy = self.zoom_center
-                painter.translate(cx + self.margin, cy + self.margin)
-                painter.scale(self.zoom_factor, self.zoom_factor)
-                painter.translate(- (cx + self.margin), - (cy + self.margin))
-            else:
-                painter.scale(self.zoom_factor, self.zoom_factor)
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.palette().window().color())
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setTransform(self.view_transform())
 
         draw_width = self.width() - 2 * self.margin
         draw_height = self.height() - 2 * self.margin
+        visible = self.visible_field_rect(self.rect())
 
         # Рисуем рамку
         painter.setPen(QPen(Qt.GlobalColor.black, 4))
         painter.drawRect(self.margin, self.margin, draw_width, draw_height)
 
-        # Рисуем сетку
+        # Рисуем сетку: при зуме — только линии в видимой области
         painter.setPen(QPen(Qt.GlobalColor.lightGray, 1))
-        for x in range(self.margin + self.grid_size, draw_width + self.margin, self.grid_size):
-            painter.drawLine(x, self.margin, x, draw_height + self.margin)
-        for y in range(self.margin + self.grid_size, draw_height + self.margin, self.grid_size):
-            painter.drawLine(self.margin, y, draw_width + self.margin, y)
+        top = max(self.margin, visible.top())
+        bottom = min(draw_height + self.margin, visible.bottom())
+        left = max(self.margin, visible.left())
+        right = min(draw_width + self.margin, visible.right())
+        first_x = self.margin + self.grid_size * max(1, int((left - self.margin) // self.grid_size))
+        first_y = self.margin + self.grid_size * max(1, int((top - self.margin) // self.grid_size))
+        for x in range(first_x, int(right) + 1, self.grid_size):
+            if x < draw_width + self.margin:
+                painter.drawLine(QLineF(x, top, x, bottom))
+        for y in range(first_y, int(bottom) + 1, self.grid_size):
+            if y < draw_height + self.margin:
+                painter.drawLine(QLineF(left, y, right, y))
 
         # Рисуем слой точек, если он есть
         if self.points_image is not None:
-            painter.drawImage(self.margin, self.margin, self.points_image)
-
-        # Рисуем синий trail
-        if self.trail:
-            painter.setPen(QPen(QColor(0, 0, 255), 2))
-            for i in range(1, len(self.trail)):
-                p1 = self.trail[i - 1]
-                p2 = self.trail[i]
-                if not p1 or not p2:
-                    continue
-                if p1[0] is None or p1[1] is None or p2[0] is None or p2[1] is None:
-                    continue
-                painter.drawLine(p1[0], p1[1], p2[0], p2[1])
+            self.draw_points_layer(painter, visible)
+
+        painter.end()
+        self.static_layer = pixmap
+        self.static_key = key
+        return pixmap
+
+    @metrics.timed("lazer_paint_seconds")
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.save()
+
+        # Статические слои берём из кэша и копируем только в область перерисовки
+        dirty = event.rect()
+        ratio = self.devicePixelRatioF()
+        source = QRectF(dirty.x() * ratio, dirty.y() * ratio, dirty.width() * ratio, dirty.height() * ratio)
+        painter.drawPixmap(QRectF(dirty), self.render_static_layer(), source)
+
+        # Применяем зум: если включён, масштабируем относительно zoom_center
+        painter.setTransform(self.view_transform())
+
+        # При зуме растровый слой растянулся бы целиком: рисуем только видимые отрезки
+        if not (self.zoom_enabled and self.draw_trail_culled(painter, dirty)):
+            # Рисуем синий trail (готовый растровый слой)
+            self.render_trail()
+            painter.drawImage(0, 0, self.trail_image)
 
         # Рисуем лазер (красная точка)
         painter.setPen(Qt.GlobalColor.red)
@@ -1,12 +1,20 @@
 from PyQt6.QtWidgets import (
-    QMainWindow, QPushButton, QVBoxLayout, QWidget, QLabel, QHBoxLayout, QSpinBox, QFileDialog, QDialog
+    QMainWindow, QPushButton, QVBoxLayout, QWidget, QLabel, QHBoxLayout, QSpinBox, QFileDialog, QDialog,
+    QComboBox, QProgressDialog, QMessageBox, QSlider
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
+from PyQt6.QtGui import QPixmap
 from controllers.laser_controller import LaserController
 from controllers.motor_controller import MotorController
 from ui.laser_view import LaserView
-from ui.image_loader import ImageLoader
-import cv2
+from ui.image_bridge import ScaledImage
+from ui.burn_preview import BurnPreview, PREVIEW_FPS
+from ui.processing_task import ImageProcessingTask
+from processing.toolpath import JOB_RASTER, JOB_CONTOUR
+from processing.estimate import format_duration
+import config
+import metrics
+from processing.dither import DITHER_NONE, DITHER_BAYER, DITHER_FLOYD_STEINBERG, DITHER_JARVIS, DITHER_POWER
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -19,21 +27,45 @@ class MainWindow(QMainWindow):
         self.laser = LaserController()
         self.laser_view = LaserView()             # Виджет отрисовки
         self.motor = MotorController(self.laser_view)
-        self.image_loader = ImageLoader()
+        self._image_loader = None  # Создаётся при первом обращении, см. image_loader
 
         # Поля для анимации лазера (прожиг) в диалоговом окне
         self.current_index = 0
         self.laser_timer = None
+        self.burn_preview = None
         self.dialog_window = None
         self.original_label = None
         self.binary_label = None
         self.laser_label = None
+        self.threshold_label = None
+        self.threshold_slider = None
+        self.threshold_timer = None
+        self.scaled_images = {}  # QLabel -> ScaledImage: кэш уменьшенных копий
+
+        # Фоновая обработка изображения
+        self.processing_task = None
+        self.progress_dialog = None
 
         self.init_ui()
 
         # Подключаем сигнал клика по полю из LaserView
         self.laser_view.coordinate_clicked.connect(self.handle_field_click)
 
+    @property
+    def image_loader(self):
+        """
+        ImageLoader создаётся при первой загрузке изображения: вместе с ним
+        загружаются OpenCV и модули обработки, которые не нужны для старта окна.
+        """
+        if self._image_loader is None:
+            from ui.image_loader import ImageLoader
+            self._image_loader = ImageLoader()
+        return self._image_loader
+
+    def has_image(self):
+        """Загружено ли изображение (без создания ImageLoader)."""
+        return self._image_loader is not None and self._image_loader.gray_image is not None
+
     def init_ui(self):
         container = QWidget()
         layout = QVBoxLayout(container)
@@ -58,10 +90,12 @@ class MainWindow(QMainWindow):
         # Поле ввода скорости
         speed_layout = QHBoxLayout()
         self.speed_input = QSpinBox()
-        self.speed_input.setRange(1, 10)
-        self.speed_input.setValue(5)
-        speed_layout.addWidget(QLabel("Скорость:"))
+        self.speed_input.setRange(config.MIN_SPEED, config.MAX_SPEED)
+        self.speed_input.setSingleStep(10)
+        self.speed_input.setValue(config.DEFAULT_SPEED)
+        speed_layout.addWidget(QLabel("Скорость, шагов/с:"))
         speed_layout.addWidget(self.speed_input)
+        self.speed_input.valueChanged.connect(self.update_job_estimate)
         layout.addLayout(speed_layout)
 
         # Виджет для «поля» лазера
@@ -80,6 +114,37 @@ class MainWindow(QMainWindow):
         self.load_image_button.clicked.connect(self.load_and_process_image)
         layout.addWidget(self.load_image_button)
 
+        # Тип задания: растровый прожиг или резка по контурам
+        job_layout = QHBoxLayout()
+        self.job_type_input = QComboBox()
+        self.job_type_input.addItem("Растр", JOB_RASTER)
+        self.job_type_input.addItem("Контур", JOB_CONTOUR)
+        self.job_type_input.currentIndexChanged.connect(self.rebuild_toolpath)
+        job_layout.addWidget(QLabel("Режим:"))
+        job_layout.addWidget(self.job_type_input)
+
+        # Способ перевода оттенков в прожиг: порог, дизеринг или мощность
+        self.dither_input = QComboBox()
+        self.dither_input.addItem("Порог", DITHER_NONE)
+        self.dither_input.addItem("Bayer", DITHER_BAYER)
+        self.dither_input.addItem("Floyd–Steinberg", DITHER_FLOYD_STEINBERG)
+        self.dither_input.addItem("Jarvis", DITHER_JARVIS)
+        self.dither_input.addItem("Мощность", DITHER_POWER)
+        self.dither_input.currentIndexChanged.connect(self.on_dither_changed)
+        job_layout.addWidget(QLabel("Обработка:"))
+        job_layout.addWidget(self.dither_input)
+        layout.addLayout(job_layout)
+
+        # Кнопка выжигания загруженного изображения на поле
+        self.burn_button = QPushButton("Выжечь изображение на поле")
+        self.burn_button.setEnabled(False)
+        self.burn_button.clicked.connect(self.burn_loaded_image)
+        layout.addWidget(self.burn_button)
+
+        # Оценка длительности загруженного задания
+        self.estimate_label = QLabel("Оценка времени: —")
+        layout.addWidget(self.estimate_label)
+
         # Кнопка включения/выключения лазера
         self.laser_button = QPushButton("Включить лазер")
         self.laser_button.clicked.connect(self.toggle_laser)
@@ -102,6 +167,7 @@ class MainWindow(QMainWindow):
 
         # При каждом обновлении координат обновляем label
         self.motor.position_changed.connect(self.update_coordinates)
+        self.motor.job_finished.connect(self.on_job_finished)
 
     def toggle_zoom_mode(self, enabled):
         """
@@ -130,22 +196,72 @@ class MainWindow(QMainWindow):
 
     def load_and_process_image(self):
         """
-        Загружает изображение через ImageLoader, анализирует его, создаёт laser_simulation,
-        и открывает диалог с анимацией прожига (не затрагивая главное поле LaserView).
+        Загружает изображение через ImageLoader и запускает его обработку в фоне.
+        По окончании создаётся laser_simulation и открывается диалог с анимацией
+        прожига (не затрагивая главное поле LaserView).
         """
         file_path = self.image_loader.load_image()
         if not file_path:
             return
 
-        points = self.image_loader.process_image()
-        if not points:
+        self.start_processing()
+
+    def start_processing(self, finished=None, parent=None):
+        """
+        Запускает фоновую обработку загруженного изображения.
+        По окончании вызывается finished(points), по умолчанию on_processing_finished;
+        индикатор хода показывается поверх parent (по умолчанию — главного окна).
+        """
+        self.image_loader.dither = self.dither_input.currentData()
+        task = ImageProcessingTask(self.image_loader, self.job_type_input.currentData())
+        task.signals.progress.connect(self.on_processing_progress)
+        task.signals.finished.connect(finished or self.on_processing_finished)
+        task.signals.failed.connect(self.on_processing_failed)
+        self.processing_task = task
+
+        self.progress_dialog = QProgressDialog("Обработка изображения…", "Отмена", 0, 0, parent or self)
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(300)
+        self.progress_dialog.canceled.connect(task.cancel)
+
+        self.load_image_button.setEnabled(False)
+        self.burn_button.setEnabled(False)
+        self.job_type_input.setEnabled(False)
+        self.dither_input.setEnabled(False)
+        QThreadPool.globalInstance().start(task)
+
+    def on_processing_progress(self, done, total):
+        if self.progress_dialog is not None:
+            self.progress_dialog.setMaximum(total)
+            self.progress_dialog.setValue(done)
+
+    def finish_processing(self):
+        """Закрывает индикатор и возвращает кнопки после фоновой обработки."""
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect()
+            self.progress_dialog.close()
+            self.progress_dialog = None
+        self.processing_task = None
+        self.load_image_button.setEnabled(True)
+        self.job_type_input.setEnabled(True)
+        self.dither_input.setEnabled(True)
+
+    def on_processing_failed(self, message):
+        self.finish_processing()
+        QMessageBox.warning(self, "Ошибка", f"Не удалось обработать изображение: {message}")
+
+    def on_processing_finished(self, points):
+        self.finish_processing()
+        if points is None:
+            print("⚠️ Обработка отменена.")
+            return
+        if len(points) == 0:
             print("⚠️ Нет активных точек в изображении.")
             return
 
         print(f"✅ Обнаружено {len(points)} точек для обработки.")
-
-        # Создаём белое изображение для симуляции
-        self.image_loader.create_laser_simulation()
+        self.burn_button.setEnabled(len(self.image_loader.segments) > 0)
+        self.update_job_estimate()
 
         # НЕ вызываем self.laser_view.set_laser_path(points),
         # чтобы не отображать это изображение в главном поле.
@@ -154,6 +270,60 @@ class MainWindow(QMainWindow):
         # Открываем диалог с тремя изображениями (оригинал, бинарка, laser_simulation)
         self.show_images_dialog()
 
+    def rebuild_toolpath(self):
+        """Перестраивает траекторию загруженного изображения под выбранный режим."""
+        if not self.has_image() or self.image_loader.mask is None:
+            return
+
+        job_type = self.job_type_input.currentData()
+        if self.image_loader.needs_processing(job_type):
+            # Большое изображение: отрезки пересчитываются полосами в фоне
+            self.start_processing(self.on_toolpath_processed)
+            return
+
+        self.image_loader.build_toolpath(job_type)
+        self.burn_button.setEnabled(len(self.image_loader.segments) > 0)
+        self.update_job_estimate()
+
+    def on_toolpath_processed(self, points):
+        """Фоновая перестройка траектории закончена: диалог не открывается заново."""
+        self.finish_processing()
+        if points is None:
+            print("⚠️ Обработка отменена.")
+            return
+        self.burn_button.setEnabled(len(self.image_loader.segments) > 0)
+        self.update_job_estimate()
+
+    def update_job_estimate(self):
+        """Показывает расчётное время выжигания загруженного задания при выбранной скорости."""
+        if not self.has_image() or len(self.image_loader.segments) == 0:
+            self.estimate_label.setText("Оценка времени: —")
+            return
+
+        estimate = self.motor.estimate_segments(self.image_loader.segments, self.speed_input.value())
+        self.estimate_label.setText(
+            f"Оценка времени: {format_duration(estimate['total_time'])} "
+            f"(прожиг {format_duration(estimate['burn_time'])}, "
+            f"переезды {format_duration(estimate['travel_time'])}, "
+            f"включений лазера: {estimate['laser_switches'] // 2})"
+        )
+
+    def on_dither_changed(self):
+        """Смена способа обработки требует заново построить маску и траекторию."""
+        if not self.has_image():
+            return
+        self.start_processing()
+
+    def burn_loaded_image(self):
+        """Запускает выжигание траектории загруженного изображения на поле."""
+        segments = self.image_loader.segments
+        if len(segments) == 0:
+            print("⚠️ Нет траектории для выжигания.")
+            return
+
+        self.motor.set_speed(self.speed_input.value())
+        self.motor.run_segments(segments)
+
     def show_images_dialog(self):
         """
         Создаёт диалоговое окно с тремя QLabel:
@@ -161,6 +331,7 @@ class MainWindow(QMainWindow):
         2) Бинарка
         3) Лазерная симуляция (будем анимировать)
         """
+        self.scaled_images.clear()
         self.dialog_window = QDialog(self)
         self.dialog_window.setWindowTitle("Просмотр изображений")
         self.dialog_window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
@@ -178,6 +349,23 @@ class MainWindow(QMainWindow):
         images_layout.addWidget(self.laser_label)
 
         main_layout.addLayout(images_layout)
+
+        # Ползунок порога: бинарка обновляется сразу, точки — после паузы
+        threshold_layout = QHBoxLayout()
+        self.threshold_label = QLabel(f"Порог: {self.image_loader.threshold}")
+        self.threshold_slider = QSlider(Qt.Orientation.Horizontal)
+        self.threshold_slider.setRange(0, 255)
+        self.threshold_slider.setValue(self.image_loader.threshold)
+        self.threshold_slider.valueChanged.connect(self.on_threshold_changed)
+        threshold_layout.addWidget(self.threshold_label)
+        threshold_layout.addWidget(self.threshold_slider)
+        main_layout.addLayout(threshold_layout)
+
+        self.threshold_timer = QTimer(self.dialog_window)
+        self.threshold_timer.setSingleShot(True)
+        self.threshold_timer.setInterval(250)
+        self.threshold_timer.timeout.connect(self.apply_threshold)
+
         self.dialog_window.setLayout(main_layout)
 
         # Обновляем содержимое каждого QLabel
@@ -194,90 +382,101 @@ class MainWindow(QMainWindow):
 
         self.dialog_window.exec()
 
+    def on_threshold_changed(self, value):
+        """Мгновенный предпросмотр бинарки при движении ползунка порога."""
+        self.image_loader.set_threshold(value)
+        self.threshold_label.setText(f"Порог: {value}")
+        self.update_image_label(self.binary_label, self.image_loader.binary_image)
+        self.threshold_timer.start()
+
+    def apply_threshold(self):
+        """Пересчитывает точки и траекторию по выбранному порогу и перезапускает анимацию."""
+        if self.laser_timer is not None:
+            self.laser_timer.stop()
+
+        points = self.image_loader.commit_threshold()
+        print(f"🔹 Порог {self.image_loader.threshold}: {len(points)} точек")
+        if self.image_loader.needs_processing(self.job_type_input.currentData()):
+            # Пока полосы считаются в фоне, порог не меняется
+            self.threshold_slider.setEnabled(False)
+            self.start_processing(self.on_threshold_processed, self.dialog_window)
+            return
+        self.rebuild_toolpath()
+
+        self.image_loader.create_laser_simulation()
+        self.update_image_label(self.laser_label, self.image_loader.laser_simulation)
+        self.start_laser_animation()
+
+    def on_threshold_processed(self, points):
+        """Большое изображение пересчитано по новому порогу: обновляем диалог."""
+        self.threshold_slider.setEnabled(True)
+        self.on_toolpath_processed(points)
+        if points is None:
+            return
+        self.update_image_label(self.binary_label, self.image_loader.binary_image)
+        self.update_image_label(self.laser_label, self.image_loader.laser_simulation)
+        self.start_laser_animation()
+
     def start_laser_animation(self):
         """
         Создаём таймер, который будет «прожигать» пиксели в self.image_loader.laser_simulation,
         показывая результат в self.laser_label.
         """
-        if not self.image_loader.points or self.image_loader.laser_simulation is None:
+        if len(self.image_loader.points) == 0 or self.image_loader.laser_simulation is None:
             print("⚠️ Нечего анимировать.")
             return
 
-        self.current_index = 0
+        # Вся анимация укладывается в duration_ms независимо от числа точек
+        self.burn_preview = BurnPreview(
+            self.image_loader.laser_simulation,
+            self.image_loader.points,
+            self.image_loader.mask.shape,
+            duration_ms=5000,
+        )
+        self.burn_preview.start()
+
+        if self.laser_timer is not None:
+            self.laser_timer.stop()
         self.laser_timer = QTimer(self)
         self.laser_timer.timeout.connect(self.animate_laser)
+        self.laser_timer.start(1000 // PREVIEW_FPS)
 
-        # Установим общее время анимации, например, 5 секунд
-        total_points = len(self.image_loader.points)
-        duration_ms = 5000
-        step_time = max(duration_ms // total_points, 10)
-        print(f"⏳ Интервал таймера: {step_time} мс")
-
-        self.laser_timer.start(step_time)
-
+    @metrics.timed("lazer_animate_seconds")
     def animate_laser(self):
         """
-        За один «тик» закрашиваем часть точек в laser_simulation чёрным цветом
+        За один «тик» закрашиваем точки, положенные к этому моменту,
         и обновляем laser_label.
         """
-        points = self.image_loader.points
-        laser_sim = self.image_loader.laser_simulation
-
-        if self.current_index >= len(points):
+        burned = self.burn_preview.index
+        if self.burn_preview.advance():
+            self.laser_label.setPixmap(QPixmap.fromImage(self.scaled_images[self.laser_label].image))
+
+        self.current_index = self.burn_preview.index
+        if metrics.enabled:
+            metrics.observe("lazer_animate_points", self.current_index - burned)
+        if self.burn_preview.done():
             self.laser_timer.stop()
             print("✅ Анимация завершена")
-            return
-
-        step_size = 50  # кол-во пикселей, которые «прожигаем» за один тик
-        end_index = min(self.current_index + step_size, len(points))
-
-        for i in range(self.current_index, end_index):
-            x, y = points[i]
-            laser_sim[y, x] = [0, 0, 0]  # чёрный пиксель
-
-        self.current_index = end_index
-
-        # Обновляем laser_label
-        self.update_image_label(self.laser_label, laser_sim)
-        self.dialog_window.repaint()
-
-        if self.current_index >= len(points):
-            self.laser_timer.stop()
 
     def update_image_label(self, label: QLabel, img):
         """
         Обновляет QLabel с изображением (numpy-массив).
+        Уменьшенная копия кэшируется для каждого QLabel и при повторном
+        вызове с тем же массивом пересчитывается в тот же буфер.
         """
         if img is None or img.size == 0:
             label.setText("Нет данных")
             return
 
-        height, width = img.shape[:2]
-        max_height = 300
-        if height > max_height:
-            scale_factor = max_height / height
-            new_width = int(width * scale_factor)
-            new_height = max_height
-            img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        else:
-            new_height, new_width = height, width
-
-        # Определяем, цветное или нет
-        if len(img.shape) == 2:
-            # Grayscale
-            from PyQt6.QtGui import QImage, QPixmap
-            format_type = QImage.Format.Format_Grayscale8
-            bytes_per_line = new_width
+        scaled = self.scaled_images.get(label)
+        if scaled is not None and scaled.matches(img):
+            scaled.refresh()
         else:
-            # BGR -> RGB
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            from PyQt6.QtGui import QImage, QPixmap
-            format_type = QImage.Format.Format_RGB888
-            bytes_per_line = new_width * 3
-
-        qimage = QImage(img.data, new_width, new_height, bytes_per_line, format_type)
-        pixmap = QPixmap.fromImage(qimage)
-        label.setPixmap(pixmap)
+            scaled = ScaledImage(img, max_height=config.PREVIEW_HEIGHT)
+            self.scaled_images[label] = scaled
+
+        new_width, new_height = scaled.size
+        label.setPixmap(QPixmap.fromImage(scaled.image))
         label.setFixedSize(new_width, new_height)
 
     # ======= Методы для лазера/движения ======= #
@@ -285,6 +484,11 @@ class MainWindow(QMainWindow):
     def update_coordinates(self, x, y):
         self.coord_label.setText(f"Координаты: ({x}, {y})")
 
+    def on_job_finished(self):
+        # Возвращаем лазеру состояние кнопки после задания
+        self.motor.drawing = self.laser.laser_on
+        print("✅ Выжигание завершено")
+
     def start_movement(self):
         x_target = self.x_input.value()
         y_target = self.y_input.value()
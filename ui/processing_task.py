@@ -0,0 +1,52 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class ProcessingSignals(QObject):
+    progress = pyqtSignal(int, int)  # (готово, всего) полос/блоков
+    finished = pyqtSignal(object)    # Точки или None, если обработка отменена
+    failed = pyqtSignal(str)
+
+
+class ImageProcessingTask(QRunnable):
+    """
+    Обработка загруженного изображения в пуле потоков Qt:
+    бинаризация, извлечение точек, построение траектории и холста симуляции.
+    Если задание уже есть в кэше, обработка пропускается.
+    GUI остаётся отзывчивым, а ход работы приходит сигналом progress.
+    """
+
+    def __init__(self, image_loader, job_type):
+        super().__init__()
+        self.image_loader = image_loader
+        self.job_type = job_type
+        self.cancel_requested = False
+        self.signals = ProcessingSignals()
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def is_cancelled(self):
+        return self.cancel_requested
+
+    def run(self):
+        try:
+            loader = self.image_loader
+            if loader.load_cached(self.job_type):
+                points = loader.points
+            else:
+                points = loader.process_image(
+                    progress=self.signals.progress.emit, cancelled=self.is_cancelled
+                )
+                if points is not None and len(points) > 0 and not self.cancel_requested:
+                    loader.build_toolpath(self.job_type)
+                    loader.store_cached(self.job_type)
+
+            if points is not None and len(points) > 0 and not self.cancel_requested:
+                loader.create_laser_simulation()
+            if self.cancel_requested:
+                points = None
+        except Exception as error:  # Ошибка в потоке не должна ронять приложение
+            self.signals.failed.emit(str(error))
+            return
+
+        self.signals.finished.emit(points)
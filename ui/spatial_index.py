@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class SegmentGrid:
+    """
+    Равномерная сетка над отрезками (x0, y0, x1, y1) для выборки по прямоугольнику.
+
+    Отрезок попадает во все клетки своего ограничивающего прямоугольника.
+    Индекс хранится плоско (номера отрезков, отсортированные по клеткам,
+    и смещения клеток), поэтому запрос — это несколько срезов массива.
+    Новые отрезки копятся в «хвосте», который проверяется перебором,
+    и индекс перестраивается, когда хвост становится заметным.
+    """
+
+    def __init__(self, width, height, cell_size=32, capacity=1024):
+        self.cell_size = cell_size
+        self.columns = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+
+        self.segments = np.empty((capacity, 4), dtype=np.int32)
+        self.size = 0
+        self.indexed = 0  # Сколько первых отрезков учтено в индексе
+        self.order = np.empty(0, dtype=np.int64)
+        self.cell_starts = np.zeros(self.columns * self.rows + 1, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.size = 0
+        self.indexed = 0
+        self.order = np.empty(0, dtype=np.int64)
+        self.cell_starts[:] = 0
+
+    def extend(self, segments):
+        segments = np.asarray(segments, dtype=np.int32).reshape(-1, 4)
+        if not len(segments):
+            return
+
+        capacity = len(self.segments)
+        if self.size + len(segments) > capacity:
+            while capacity < self.size + len(segments):
+                capacity *= 2
+            self.segments = np.resize(self.segments, (capacity, 4))
+        self.segments[self.size:self.size + len(segments)] = segments
+        self.size += len(segments)
+
+        if self.size - self.indexed > max(1024, self.indexed // 4):
+            self.rebuild()
+
+    def _cells(self, x0, y0, x1, y1):
+        """Диапазоны клеток (включительно), покрывающие прямоугольники."""
+        c0 = np.clip(np.minimum(x0, x1) // self.cell_size, 0, self.columns - 1)
+        c1 = np.clip(np.maximum(x0, x1) // self.cell_size, 0, self.columns - 1)
+        r0 = np.clip(np.minimum(y0, y1) // self.cell_size, 0, self.rows - 1)
+        r1 = np.clip(np.maximum(y0, y1) // self.cell_size, 0, self.rows - 1)
+        return c0, c1, r0, r1
+
+    def rebuild(self):
+        """Перестраивает индекс по всем отрезкам, O(N + число занятых клеток)."""
+        segments = self.segments[:self.size].astype(np.int64)
+        c0, c1, r0, r1 = self._cells(*segments.T)
+        widths = c1 - c0 + 1
+        counts = widths * (r1 - r0 + 1)
+
+        # Каждому отрезку — все клетки его прямоугольника
+        owner = np.repeat(np.arange(self.size), counts)
+        step = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (r0[owner] + step // widths[owner]) * self.columns + c0[owner] + step % widths[owner]
+
+        by_cell = np.argsort(cells, kind="stable")
+        self.order = owner[by_cell]
+        self.cell_starts[0] = 0
+        np.cumsum(np.bincount(cells, minlength=self.columns * self.rows), out=self.cell_starts[1:])
+        self.indexed = self.size
+
+    def _row_ranges(self, x0, y0, x1, y1):
+        c0, c1, r0, r1 = (int(v) for v in self._cells(int(x0), int(y0), int(x1), int(y1)))
+        starts = self.cell_starts[np.arange(r0, r1 + 1) * self.columns + c0]
+        ends = self.cell_starts[np.arange(r0, r1 + 1) * self.columns + c1 + 1]
+        return starts, ends
+
+    def estimate(self, x0, y0, x1, y1):
+        """
+        Быстрая верхняя оценка числа отрезков в прямоугольнике (без выборки):
+        отрезок из нескольких клеток может быть посчитан несколько раз.
+        """
+        starts, ends = self._row_ranges(x0, y0, x1, y1)
+        return int((ends - starts).sum()) + self.size - self.indexed
+
+    def query(self, x0, y0, x1, y1):
+        """Отрезки, ограничивающий прямоугольник которых пересекает прямоугольник запроса."""
+        starts, ends = self._row_ranges(x0, y0, x1, y1)
+        parts = [self.order[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+        parts.append(np.arange(self.indexed, self.size))
+        ids = np.unique(np.concatenate(parts))
+
+        segments = self.segments[ids]
+        inside = (
+            (np.maximum(segments[:, 0], segments[:, 2]) >= x0)
+            & (np.minimum(segments[:, 0], segments[:, 2]) <= x1)
+            & (np.maximum(segments[:, 1], segments[:, 3]) >= y0)
+            & (np.minimum(segments[:, 1], segments[:, 3]) <= y1)
+        )
+        return segments[inside]
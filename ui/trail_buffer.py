@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class TrailBuffer:
+    """
+    «След» лазера в растущем массиве NumPy.
+
+    points — координаты (x, y), breaks — признак начала нового участка:
+    точка с breaks[i] = True не соединяется линией с предыдущей.
+    Память растёт удвоением, поэтому добавление точки в среднем O(1).
+    """
+
+    def __init__(self, capacity=1024):
+        self.points = np.empty((capacity, 2), dtype=np.int32)
+        self.breaks = np.empty(capacity, dtype=bool)
+        self.size = 0
+        self.pending_break = True  # Следующая точка начнёт новый участок
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, count):
+        capacity = len(self.points)
+        if self.size + count <= capacity:
+            return
+        while capacity < self.size + count:
+            capacity *= 2
+        self.points = np.resize(self.points, (capacity, 2))
+        self.breaks = np.resize(self.breaks, capacity)
+
+    def append(self, x, y):
+        self._reserve(1)
+        self.points[self.size] = (x, y)
+        self.breaks[self.size] = self.pending_break
+        self.pending_break = False
+        self.size += 1
+
+    def extend(self, points, breaks=None):
+        """
+        Добавляет точки (N, 2) одним копированием. breaks[i] — точка i начинает
+        новый участок; без breaks точки образуют одну ломаную, продолжающую текущий участок.
+        """
+        points = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+        if not len(points):
+            return
+        self._reserve(len(points))
+        end = self.size + len(points)
+        self.points[self.size:end] = points
+        self.breaks[self.size:end] = False if breaks is None else breaks
+        self.breaks[self.size] |= self.pending_break
+        self.pending_break = False
+        self.size = end
+
+    def add_break(self):
+        self.pending_break = True
+
+    def clear(self):
+        self.size = 0
+        self.pending_break = True
+
+    def segments(self, start=0):
+        """
+        Отрезки (x0, y0, x1, y1), заканчивающиеся в точках с индексом >= start.
+        Отрезки через разрывы пропускаются.
+        """
+        first = max(start, 1)
+        if first >= self.size:
+            return np.empty((0, 4), dtype=np.int32)
+
+        connected = ~self.breaks[first:self.size]
+        ends = self.points[first:self.size][connected]
+        begins = self.points[first - 1:self.size - 1][connected]
+        return np.hstack((begins, ends))